@@ -7,6 +7,9 @@ from PIL import Image, ImageTk
 # Import all frames and modules
 from constans import *
 from Moduls.Book_Manager import BookManager
+from Moduls.Repository import Repository
+from Moduls.Access_Log import AccessLog
+from Moduls.Penalty_Manager import PenaltyManager
 from UI.DaftarBukuFrame import DataBookFrame
 from UI.DetailsBookFrame import DetailsBookFrame
 from UI.UpdateBookFrame import UpdateBookFrame
@@ -16,6 +19,10 @@ from UI.LoginFrame import LoginFrame
 from UI.HomeFrame import HomeFrame
 from UI.BorrowPopUp import BorrowPopUp
 from UI.PenaltyBookFrame import PenaltyBookFrame
+from UI.LogFrame import LogFrame
+
+# Frame yang dibangun di belakang layar (saat idle) setelah login
+PREWARM_FRAMES = ("DataBookFrame", "DetailsBookFrame", "MyBookFrame")
 
 
 class Application:
@@ -27,15 +34,21 @@ class Application:
         
         self.setupDirectories()
         self.root.iconbitmap(os.path.join(self.assets_dir, "logo.ico"))
-        self.bookManager = BookManager(
-            os.path.join(self.data_dir, "data_buku_2.xlsx"),
-            os.path.join(self.assets_dir, "Cover"),
-            os.path.join(self.assets_dir, "IMG.jpg")
-        )
+        # SQLite jika data/bookku.db sudah dibuat (python -m Moduls.Repository), selain itu JSON/XLSX
+        self.repository = Repository(self.data_dir)
+        # Log akses JSON Lines dengan rotasi (data/logs/), ditulis di thread sendiri
+        self.accessLog = AccessLog(os.path.join(self.data_dir, "logs"))
+        # Katalog baru dimuat saat pertama dibutuhkan (lihat property bookManager)
+        self._bookManager = None
+        # Dibuat saat pertama dibutuhkan lalu dipakai ulang, lihat getPenaltyManager
+        self.penaltyManager = None
         self.color= None
         self.selectedBook = None
         self.current_user = None
+        self.prewarm = True
+        self._prewarmed = False
         self.createWidgets()
+        self.root.protocol("WM_DELETE_WINDOW", self.onClose)
         
     
     def setupDirectories(self):
@@ -90,21 +103,57 @@ class Application:
             "LoginFrame" : LoginFrame,
             "HomeFrame" : HomeFrame,
             "PenaltyBookFrame": PenaltyBookFrame,    
+            "LogFrame": LogFrame,
         }
 
-        self.setupFrames()
-        self.showFrame("LoginFrame")  # Start with book list
+        # Frame lain dibuat saat pertama kali ditampilkan (getFrame)
+        self.setupFrames(["LoginFrame"])
+        self.showFrame("LoginFrame")  # Start with login
+
+    def setupFrames(self, names=None):
+        for name in names or self.frameClasses:
+            self.getFrame(name)
 
-    def setupFrames(self):
-        for name, FrameClass in self.frameClasses.items():
-            frame = FrameClass(self.container, self)
-            self.frames[name] = frame
+    def getFrame(self, frameName):
+        """Frame dari cache, dibangun dulu jika belum pernah dibuat"""
+        frame = self.frames.get(frameName)
+        if frame is None:
+            frame = self.frameClasses[frameName](self.container, self)
             frame.grid(row=0, column=0, sticky="nsew")
+            self.frames[frameName] = frame
+        return frame
+
+    @property
+    def bookManager(self):
+        """BookManager dibuat saat pertama diakses agar layar login tidak menunggu katalog"""
+        if self._bookManager is None:
+            self._bookManager = BookManager(
+                os.path.join(self.data_dir, "data_buku_2.xlsx"),
+                os.path.join(self.assets_dir, "Cover"),
+                os.path.join(self.assets_dir, "IMG.jpg"),
+                store=self.repository.book_store(os.path.join(self.data_dir, "data_buku_2.xlsx"))
+            )
+        return self._bookManager
+
+    def prewarmFrames(self, names=PREWARM_FRAMES):
+        """Bangun frame yang belum ada satu per satu saat Tk idle"""
+        pending = [name for name in names if name not in self.frames]
+        if pending:
+            self.root.after_idle(self._prewarmNext, pending)
+
+    def _prewarmNext(self, pending):
+        name = pending.pop(0)
+        if name not in self.frames:
+            # Frame baru tertumpuk paling atas, turunkan agar frame aktif tetap terlihat
+            self.getFrame(name).lower()
+        if pending:
+            # Beri kesempatan event lain diproses sebelum frame berikutnya
+            self.root.after(50, self.root.after_idle, self._prewarmNext, pending)
 
     def showFrame(self, frameName):
         """Show the specified frame and update it if needed"""
-        if frameName in self.frames:
-            frame = self.frames[frameName]
+        if frameName in self.frameClasses:
+            frame = self.getFrame(frameName)
             
             # Update frame content if needed
             if frameName == "DetailsBookFrame":
@@ -125,29 +174,45 @@ class Application:
                     frame.populate_book_grid()
 
             elif frameName == "HomeFrame":
-                OldFrame = self.frames["HomeFrame"]
-                OldFrame.destroy()
-                print(self.current_user)
-                Newframe = HomeFrame(self.container, self)
-                Newframe.grid(row=0, column=0, sticky="nsew")
-                frame = Newframe
+                frame.refresh(self.current_user)
+                if self.prewarm and not self._prewarmed:
+                    self._prewarmed = True
+                    self.prewarmFrames()
 
             elif frameName == "PenaltyBookFrame":
-                OldFrame = self.frames["PenaltyBookFrame"]
-                OldFrame.destroy()
-                print(self.current_user)
-                Newframe = PenaltyBookFrame(self.container, self)
-                Newframe.grid(row=0, column=0, sticky="nsew")
-                frame = Newframe
+                frame.refresh(self.current_user)
 
             elif frameName == "MyBookFrame":
                 if hasattr(frame, "load_current_books"):
                     frame.load_current_books()
+
+            elif frameName == "LogFrame":
+                frame.refresh()
                 
             
             frame.tkraise()
             self.currentFrame = frameName
 
+    def onClose(self):
+        """Simpan perubahan yang tertunda sebelum aplikasi ditutup"""
+        # Katalog yang belum pernah dimuat tidak perlu dibuka hanya untuk ditutup
+        if self._bookManager is not None:
+            self._bookManager.close()
+        if self.penaltyManager is not None:
+            self.penaltyManager.saveData()
+        self.accessLog.close()
+        self.repository.close()
+        self.root.destroy()
+
+    def getPenaltyManager(self):
+        """PenaltyManager bersama, sinkron dengan repository lewat syncWithStore"""
+        if self.penaltyManager is None:
+            self.penaltyManager = PenaltyManager(repository=self.repository)
+            if getattr(self, "test_mode", False):
+                self.penaltyManager.test_mode = True
+                self.penaltyManager.set_test_date(self.test_date)
+        return self.penaltyManager
+
     def GetStatusUser(self):
         return self.current_user["role"]
     
@@ -200,13 +265,11 @@ class Application:
             if result:
                 messagebox.showinfo("Success", f"Buku '{book_copy['Judul']}' berhasil dipinjam!")
                 # Update the selectedBook with the new data
-                if hasattr(self.bookManager, "getBookByIndeks"):
+                if hasattr(self.bookManager, "getBookByISBN"):
                     # Get the fresh data from the manager
-                    # This assumes you have a way to get a book by ISBN in your manager
-                    for idx, row in self.bookManager.getBook().iterrows():
-                        if row['ISBN'] == book_copy['ISBN']:
-                            self.selectedBook = row
-                            break
+                    fresh_book = self.bookManager.getBookByISBN(book_copy['ISBN'])
+                    if fresh_book is not None:
+                        self.selectedBook = fresh_book
                 
                 # Update the book details display
                 if "DetailsBookFrame" in self.frames:
@@ -226,8 +289,17 @@ class Application:
             return self.bookManager.ISBNexists(isbn)
         return False
     
-    def loadCover(self, isbn):
+    def getBookByISBN(self, isbn):
+        if hasattr(self.bookManager, "getBookByISBN"):
+            return self.bookManager.getBookByISBN(isbn)
+        return None
+    
+    def loadCover(self, isbn, size=(100, 150)):
         if hasattr(self.bookManager, "LoadCover"):
-            return self.bookManager.LoadCover(isbn)
+            return self.bookManager.LoadCover(isbn, size)
         return None
 
+    def invalidateCover(self, isbn):
+        if hasattr(self.bookManager, "invalidateCover"):
+            self.bookManager.invalidateCover(isbn)
+
@@ -0,0 +1,145 @@
+import os
+import json
+import gzip
+import glob
+import queue
+import atexit
+import shutil
+import threading
+from datetime import datetime, date
+
+from Moduls.Repository import FileLock
+
+ACTIVE_SUFFIX = ".jsonl"
+ROTATED_PATTERN = "{name}-{stamp}.jsonl"
+
+
+def list_segments(directory, name="access"):
+    """Semua segmen log dari yang paling lama, segmen aktif terakhir"""
+    rotated = glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(name)}-*.jsonl*"))
+    rotated = [path for path in rotated if path.endswith((".jsonl", ".jsonl.gz"))]
+    # Segmen yang sudah dikompres tapi versi mentahnya belum terhapus hanya dihitung sekali
+    rotated = [path for path in rotated if not (path.endswith(".jsonl") and os.path.exists(f"{path}.gz"))]
+    rotated.sort(key=lambda path: os.path.basename(path).split(".jsonl")[0])
+    active = os.path.join(directory, f"{name}{ACTIVE_SUFFIX}")
+    return rotated + ([active] if os.path.exists(active) else [])
+
+
+class AccessLog:
+    """Log akses append-only dalam format JSON Lines.
+
+    log() hanya memasukkan entry ke queue (O(1), aman dipanggil dari thread UI).
+    Thread writer menulis entry per batch ke segmen aktif ({name}.jsonl) dan
+    merotasi segmen ketika ukurannya melewati max_bytes atau harinya berganti.
+    Segmen lama diberi nama {name}-{YYYYmmdd-HHMMSS}.jsonl dan dikompres
+    gzip jika compress=True.
+    """
+    def __init__(self, directory, name="access", max_bytes=1024 * 1024, rotate_daily=True,
+                 compress=True, flush_interval=1.0):
+        self.directory = directory
+        self.name = name
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.path = os.path.join(directory, f"{name}{ACTIVE_SUFFIX}")
+        self.lock_path = f"{self.path}.lock"
+        os.makedirs(directory, exist_ok=True)
+
+        self.queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"{name}-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, entry):
+        """Catat satu entry (dict), ditulis oleh thread writer"""
+        if self._closed:
+            raise RuntimeError("Access log sudah ditutup")
+        self.queue.put(entry)
+
+    def flush(self):
+        """Tunggu sampai semua entry di queue tertulis ke disk"""
+        self.queue.join()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            # Kumpulkan entry lain yang masuk dalam flush_interval agar ditulis sekaligus
+            try:
+                while batch[-1] is not None:
+                    batch.append(self.queue.get(timeout=self.flush_interval if len(batch) == 1 else 0))
+            except queue.Empty:
+                pass
+
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                if entries:
+                    self._write(entries)
+            except Exception as e:
+                print(f"Error writing access log: {e}")
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if batch[-1] is None:
+                return
+
+    def _write(self, entries):
+        lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries)
+        # Lock file dipakai bersama instance aplikasi lain yang menulis ke folder yang sama
+        with FileLock(self.lock_path):
+            rotated = self._rotate_if_needed()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            # Masih di bawah lock agar penulis lain tidak melihat segmen setengah dikompres
+            if rotated and self.compress:
+                self._compress(rotated)
+
+    def _rotate_if_needed(self):
+        """Pindahkan segmen aktif jika sudah penuh atau dari hari sebelumnya"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        if stat.st_size == 0:
+            return None
+
+        last_write = datetime.fromtimestamp(stat.st_mtime)
+        too_big = stat.st_size >= self.max_bytes
+        new_day = self.rotate_daily and last_write.date() != date.today()
+        if not (too_big or new_day):
+            return None
+
+        stamp = last_write.strftime("%Y%m%d-%H%M%S")
+        target = os.path.join(self.directory, ROTATED_PATTERN.format(name=self.name, stamp=stamp))
+        counter = 1
+        while os.path.exists(target) or os.path.exists(f"{target}.gz"):
+            target = os.path.join(self.directory, ROTATED_PATTERN.format(name=self.name, stamp=f"{stamp}-{counter}"))
+            counter += 1
+        os.replace(self.path, target)
+        return target
+
+    def _compress(self, path):
+        """Kompres segmen yang sudah dirotasi lalu hapus versi mentahnya.
+
+        Ditulis ke nama sementara lalu os.replace, jadi .gz selalu utuh;
+        selama versi mentah belum terhapus list_segments hanya memakai .gz.
+        """
+        try:
+            temp_path = f"{path}.gz.tmp"
+            with open(path, "rb") as source, gzip.open(temp_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.replace(temp_path, f"{path}.gz")
+            os.remove(path)
+        except Exception as e:
+            print(f"Error compressing log segment {path}: {e}")
+
+    def segments(self):
+        return list_segments(self.directory, self.name)
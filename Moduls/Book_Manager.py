@@ -1,25 +1,88 @@
 import pandas as pd
 import numpy as np
 import os
+import threading
 from PIL import Image, ImageTk
+from Moduls.Book_Store import BookStore
+from Moduls.Search_Index import SearchIndex
+from Moduls.Cover_Cache import ThumbnailCache, ImageLRU
+from Moduls.Filter_Index import FacetIndex
+from constans import GENRE_TO_CATEGORY, GENRE_CATEGORIES
+
+# Kolom turunan yang hanya ada di memori, tidak ikut disimpan/diexport
+DERIVED_COLUMNS = ['Category']
+
+
+def categorize(kategori):
+    """Kategori filter (CATEGORY_MAPPING) untuk satu genre, 'Other' jika tidak ada"""
+    return GENRE_TO_CATEGORY.get(str(kategori), "Other")
 
 class BookManager:
-    def __init__(self, file_path, CoverDir, defaultImage):
+    def __init__(self, file_path, CoverDir, defaultImage, coverMemoryBudget=32 * 1024 * 1024, store=None):
         self.file_path = file_path
-        if os.path.exists(file_path):
-            self.book = pd.read_excel(file_path)
-        else:
-            self.book = pd.DataFrame(columns=['Judul', 'Penulis', 'Penerbit', 'Tahun','Kategori', 'ISBN', 'Halaman', 'Deskripsi','Status'])
+        # Katalog dibaca dari store (biner atau SQLite), XLSX hanya untuk import/export
+        self.store = store or BookStore(file_path)
+        self.book = self.store.load().reset_index(drop=True)
+        self.buildCategoryColumn()
+        # Naik setiap kali katalog berubah, dipakai UI untuk invalidasi cache
+        self.version = 0
+
+        # Bitmap per nilai Kategori/Tahun/Status/Category untuk filter cepat
+        self.facets = FacetIndex()
+        self.facets.build(self.book)
+
+        # Index ISBN -> posisi baris untuk lookup O(1)
+        self.isbnIndex = {}
+        self.buildISBNIndex()
+
+        # Inverted index untuk pencarian, dibangun di background lewat warmSearchIndex().
+        # Selama belum siap, perubahan katalog diantrekan dan pencarian memakai filter substring
+        self.searchIndex = SearchIndex()
+        self.searchIndexThread = None
+        self.searchIndexLock = threading.Lock()
+        self.pendingIndexChanges = []
 
         self.coverDir = CoverDir
         self.defaultImage = defaultImage
+        # Thumbnail cover yang sudah di-resize disimpan di disk
+        self.thumbnails = ThumbnailCache(CoverDir, defaultImage)
+        # Cover yang sudah di-decode dipakai bersama oleh semua frame
+        self.coverMemory = ImageLRU(coverMemoryBudget)
 
 
     def getBook(self):
         return self.book
     
+    def buildCategoryColumn(self):
+        """Materialisasi kolom Category (categorical) dari Kategori"""
+        if 'Kategori' not in self.book.columns:
+            return
+        # Map per genre unik saja, lalu disebar ke semua baris
+        kategori = self.book['Kategori'].astype(str)
+        mapping = {genre: categorize(genre) for genre in kategori.unique()}
+        self.book['Category'] = pd.Categorical(kategori.map(mapping), categories=GENRE_CATEGORIES)
+    
+    def persistedBook(self):
+        """DataFrame tanpa kolom turunan, untuk disimpan ke store/XLSX"""
+        return self.book.drop(columns=DERIVED_COLUMNS, errors='ignore')
+    
+    def buildISBNIndex(self):
+        """Bangun ulang index ISBN -> posisi baris (ISBN pertama yang menang)"""
+        self.isbnIndex = {}
+        if 'ISBN' not in self.book.columns:
+            return
+        for position, isbn in enumerate(self.book['ISBN'].tolist()):
+            self.isbnIndex.setdefault(str(isbn), position)
+    
+    def getBookByISBN(self, isbn):
+        """Ambil satu buku berdasarkan ISBN, None jika tidak ada"""
+        position = self.isbnIndex.get(str(isbn))
+        if position is None:
+            return None
+        return self.book.iloc[position]
+    
     def getCoverImage(self, ISBN):
-        if ISBN in self.book['ISBN'].values:
+        if str(ISBN) in self.isbnIndex:
             cover_path = os.path.join(self.coverDir, f"{ISBN}.jpg")
             if os.path.exists(cover_path):
                 return ImageTk.PhotoImage(Image.open(cover_path))
@@ -48,25 +111,57 @@ class BookManager:
             return False
         
     def ISBNexists(self, isbn):
-        # Convert to string for comparison if needed
-        isbn_str = str(isbn)
-        # Check if any row's ISBN equals the given ISBN
-        return (self.book['ISBN'].astype(str) == isbn_str).any()
+        return str(isbn) in self.isbnIndex
         
     def addBook(self, book):
         """Add a new book to the DataFrame"""
+        # ISBN harus unik: journal me-replay "add" untuk ISBN yang sudah ada sebagai update
+        if self.ISBNexists(book.get('ISBN')):
+            return False
+        
         # Convert dictionary to DataFrame
+        book = {column: value for column, value in book.items() if column not in DERIVED_COLUMNS}
         book_df = pd.DataFrame([book])
+        if 'Category' in self.book.columns:
+            book_df['Category'] = pd.Categorical([categorize(book.get('Kategori'))], categories=GENRE_CATEGORIES)
         
         # Concatenate with existing DataFrame
         self.book = pd.concat([self.book, book_df], ignore_index=True)
-        self.save()
+        self.isbnIndex.setdefault(str(book['ISBN']), len(self.book) - 1)
+        self.facets.append(self.book.iloc[-1].to_dict())
+        self.version += 1
+        self.indexChange("add", book['ISBN'], book)
+        return self.journal("add", book['ISBN'], book)
+    
+    def journal(self, op, isbn, data=None):
+        """Catat satu perubahan baris ke journal, tanpa menulis ulang seluruh katalog"""
+        try:
+            self.store.append(op, isbn, data)
+        except Exception as e:
+            from tkinter import messagebox
+            messagebox.showerror(
+                "Error",
+                f"Terjadi kesalahan saat menyimpan data:\n{str(e)}"
+            )
+            return False
+
+        # Gabungkan journal ke store di background jika sudah terlalu panjang
+        if self.store.needs_compaction():
+            self.store.compact(background=True)
         return True
     
+    def close(self):
+        """Compact journal ke store, dipanggil saat aplikasi ditutup"""
+        try:
+            self.store.close()
+        except Exception as e:
+            print(f"Error closing book store: {e}")
+    
     def save(self):
+        """Flush perubahan ke store (compact journal), tidak menulis ulang dari DataFrame"""
         try:
             # Try to save directly
-            self.book.to_excel(self.file_path, index=False)
+            self.store.compact()
             return True
         except PermissionError:
             from tkinter import messagebox
@@ -76,20 +171,20 @@ class BookManager:
             # Inform the user
             response = messagebox.askretrycancel(
                 "File Access Error",
-                f"Tidak dapat menyimpan ke file '{os.path.basename(self.file_path)}'. File mungkin sedang terbuka di program lain atau Anda tidak memiliki izin yang cukup.\n\nTutup program lain yang membuka file ini dan coba lagi."
+                f"Tidak dapat menyimpan ke file '{os.path.basename(self.store.store_path)}'. File mungkin sedang terbuka di program lain atau Anda tidak memiliki izin yang cukup.\n\nTutup program lain yang membuka file ini dan coba lagi."
             )
             
             if response:  # User wants to retry
                 try:
                     # Wait briefly then try again
                     time.sleep(1)
-                    self.book.to_excel(self.file_path, index=False)
+                    self.store.compact()
                     return True
                 except Exception as e:
                     # If still fails, try saving to a backup location
                     backup_path = self.file_path.replace(".xlsx", f"_backup_{int(time.time())}.xlsx")
                     try:
-                        self.book.to_excel(backup_path, index=False)
+                        self.store.export_excel(self.persistedBook(), backup_path)
                         messagebox.showinfo(
                             "Berhasil Disimpan ke Backup",
                             f"Data berhasil disimpan ke file backup:\n{os.path.basename(backup_path)}"
@@ -111,55 +206,131 @@ class BookManager:
             )
             return False
     
+    def exportExcel(self, path=None):
+        """Export katalog ke file XLSX"""
+        try:
+            return self.store.export_excel(self.persistedBook(), path)
+        except Exception as e:
+            print(f"Error exporting to Excel: {e}")
+            return None
+    
     def UpdateBook(self, bookUpdate):
         # Find the index of the book to update
-        mask = self.book['ISBN'].astype(str) == str(bookUpdate['ISBN'])
-        if not mask.any():
+        position = self.isbnIndex.get(str(bookUpdate['ISBN']))
+        if position is None:
             # print(f"Book with ISBN {bookUpdate['ISBN']} not found")
             return False
             
         # Get the index where the ISBN matches
-        idx = mask.idxmax()
+        idx = self.book.index[position]
         
         # Update all fields for the book at this index
+        changes = {}
         for column in self.book.columns:
-            if column in bookUpdate:
+            if column in bookUpdate and column not in DERIVED_COLUMNS:
                 self.book.at[idx, column] = bookUpdate[column]
+                changes[column] = bookUpdate[column]
         
-        # Save the updated DataFrame
-        self.save()
-        return True
+        if 'Kategori' in changes and 'Category' in self.book.columns:
+            self.book.at[idx, 'Category'] = categorize(changes['Kategori'])
+        self.facets.update(position, self.book.iloc[position].to_dict())
+        self.version += 1
+        
+        self.indexChange("update", bookUpdate['ISBN'], self.book.loc[idx].to_dict())
+        
+        # Catat perubahan ke journal
+        return self.journal("update", bookUpdate['ISBN'], changes)
     
+    def warmSearchIndex(self):
+        """Bangun index pencarian di background, tidak pernah ditunggu oleh thread UI"""
+        if self.searchIndex.built or self.searchIndexThread is not None:
+            return
+        # Snapshot diambil di thread pemanggil; perubahan setelah ini masuk pendingIndexChanges
+        columns = [column for column in self.searchIndex.fields if column in self.book.columns]
+        if 'ISBN' not in columns:
+            columns.append('ISBN')
+        snapshot = self.book[columns].copy()
+        self.searchIndexThread = threading.Thread(
+            target=self._buildSearchIndex, args=(snapshot,), daemon=True
+        )
+        self.searchIndexThread.start()
+
+    def _buildSearchIndex(self, snapshot):
+        index = SearchIndex(self.searchIndex.fields, self.searchIndex.ngram_size)
+        try:
+            index.build(snapshot)
+        except Exception as e:
+            print(f"Error building search index: {e}")
+            # Build ulang di warm berikutnya dari snapshot baru, antrean sudah tercakup di sana
+            with self.searchIndexLock:
+                self.pendingIndexChanges = []
+                self.searchIndexThread = None
+            return
+        with self.searchIndexLock:
+            for op, isbn, record in self.pendingIndexChanges:
+                self._applyIndexChange(index, op, isbn, record)
+            self.pendingIndexChanges = []
+            self.searchIndex = index
+
+    def indexChange(self, op, isbn, record=None):
+        """Terapkan perubahan ke index, atau antrekan jika index masih dibangun"""
+        with self.searchIndexLock:
+            if self.searchIndex.built:
+                self._applyIndexChange(self.searchIndex, op, isbn, record)
+            elif self.searchIndexThread is not None:
+                self.pendingIndexChanges.append((op, isbn, record))
+            # Belum pernah di-warm: build nanti memakai snapshot katalog terbaru
+
+    @staticmethod
+    def _applyIndexChange(index, op, isbn, record):
+        if op == "delete":
+            index.remove(isbn)
+        else:
+            index.add(isbn, record)
+
+    def substringSearch(self, keyword):
+        """Filter substring tanpa index (dipakai selama index belum siap)"""
+        keyword = str(keyword).strip()
+        columns = [column for column in ('Judul', 'Penulis', 'Penerbit', 'Tahun', 'ISBN',
+                                         'Deskripsi', 'Kategori', 'Status') if column in self.book.columns]
+        mask = np.zeros(len(self.book), dtype=bool)
+        for column in columns:
+            mask |= self.book[column].astype(str).str.contains(keyword, case=False, regex=False, na=False).to_numpy()
+        return self.book[mask]
+
     def searchBook(self, keyword):
-        return self.book[self.book['Judul'].str.contains(keyword) | 
-                         self.book['Penulis'].str.contains(keyword) |
-                         self.book['Penerbit'].str.contains(keyword) |
-                         self.book['Tahun'].str.contains(keyword) |
-                         self.book['ISBN'].str.contains(keyword) |
-                         self.book['Deskripsi'].str.contains(keyword) |
-                         self.book['Kategori'].str.contains(keyword) |
-                         self.book['Status'].str.contains(keyword)]
+        """Cari buku lewat inverted index, hasil diurutkan berdasarkan relevansi"""
+        if not self.searchIndex.built:
+            self.warmSearchIndex()
+            return self.substringSearch(keyword)
+
+        positions = []
+        for isbn, score in self.searchIndex.search(keyword):
+            position = self.isbnIndex.get(isbn)
+            if position is not None:
+                positions.append(position)
+        return self.book.iloc[positions]
     
     def deleteBook(self, ISBN):
-        self.book = self.book[self.book['ISBN']!= ISBN]
-        return True
+        if str(ISBN) not in self.isbnIndex:
+            return False
+        self.book = self.book[self.book['ISBN'].astype(str) != str(ISBN)].reset_index(drop=True)
+        # Posisi baris setelah buku yang dihapus bergeser
+        self.buildISBNIndex()
+        self.facets.build(self.book)
+        self.version += 1
+        self.indexChange("delete", ISBN)
+        return self.journal("delete", ISBN)
     
     def FilterByKategori(self, Kategori = None, Tahun = None, Status = None):
-        conditions = []
-
-        if Kategori is not None:
-            conditions.append(np.isin(self.book['Kategori'], Kategori if isinstance(Kategori, list) else [Kategori]))
-
-        if Tahun is not None:
-            conditions.append(np.isin(self.book['Tahun'], Tahun if isinstance(Tahun, list) else [Tahun]))
-
-        if Status is not None:
-            conditions.append(np.isin(self.book['Status'], Status if isinstance(Status, list) else [Status]))
-
-        if conditions:
-            return self.book[np.logical_and.reduce(conditions)]
-        else:
+        positions = self.facets.positions(Kategori=Kategori, Tahun=Tahun, Status=Status)
+        if len(positions) == len(self.book):
             return self.book #Jika kategori tidak ada yang dipilih
+        return self.book.iloc[positions]
+    
+    def facetMask(self, **facets):
+        """Mask boolean per posisi baris untuk kombinasi filter (AND antar kolom)"""
+        return self.facets.mask(**facets)
         
     def UpdateStatus(self, Status):
         self.book.loc[self.book['ISBN'] == book['ISBN'], 'Status'] = book['Status']
@@ -177,28 +348,43 @@ class BookManager:
     def daftarPenerbit(self):
         return self.book['Penerbit'].unique().tolist()
         
-    def LoadCover(self, isbn):
+    def LoadCover(self, isbn, size=(100, 150)):
         """Load book cover image as CTkImage"""
-        import customtkinter as ctk
+        cover = self.peekCover(isbn, size)
+        if cover is not None:
+            return cover
         
-        size = (100, 150)
-        
-        # Check if book image exists
-        img_path = os.path.join(self.coverDir, f"{isbn}.jpeg")
-        if not os.path.exists(img_path) or not isbn:
-            # Use default image if not found
-            img_path = self.defaultImage
-                
         try:
-            img = Image.open(img_path)
-            img = img.resize(size, Image.LANCZOS)
-            return ctk.CTkImage(light_image=img, dark_image=img, size=size)
+            return self.coverFromImage(isbn, size, self.decodeCover(isbn, size))
         except Exception as e:
+            import customtkinter as ctk
             print(f"Error loading image: {e}")
             # Create blank image on error
             blank_img = Image.new('RGB', size, color='lightgray')
             return ctk.CTkImage(light_image=blank_img, dark_image=blank_img, size=size)
 
+    def peekCover(self, isbn, size=(100, 150)):
+        """Cover dari cache memori saja, None jika belum pernah di-decode"""
+        return self.coverMemory.get((str(isbn) if isbn else "", tuple(size)))
+
+    def decodeCover(self, isbn, size=(100, 150)):
+        """Decode thumbnail cover ke PIL Image. Aman dipanggil dari worker thread."""
+        return self.thumbnails.get(str(isbn) if isbn else "", tuple(size))
+
+    def coverFromImage(self, isbn, size, img):
+        """Bungkus PIL Image menjadi CTkImage dan simpan di cache memori (main thread)"""
+        import customtkinter as ctk
+        
+        size = tuple(size)
+        cover = ctk.CTkImage(light_image=img, dark_image=img, size=size)
+        self.coverMemory.put((str(isbn) if isbn else "", size), cover, size)
+        return cover
+
+    def invalidateCover(self, isbn):
+        """Buang thumbnail lama setelah file cover buku diganti"""
+        self.thumbnails.invalidate(isbn)
+        self.coverMemory.discard(str(isbn))
+
     
 
 if __name__ == '__main__':
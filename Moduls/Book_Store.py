@@ -0,0 +1,363 @@
+import os
+import json
+import threading
+import pandas as pd
+
+from Moduls.File_Lock import FileLock
+
+BOOK_COLUMNS = ['Judul', 'Penulis', 'Penerbit', 'Tahun', 'Kategori', 'ISBN', 'Halaman', 'Deskripsi', 'Status']
+
+
+def _json_default(value):
+    """Konversi nilai numpy/pandas agar bisa ditulis ke journal"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if pd.isna(value):
+        return None
+    return str(value)
+
+
+class BookStore:
+    """Penyimpanan katalog buku dalam format biner (pickle DataFrame).
+
+    File XLSX hanya dipakai untuk import (migrasi awal / XLSX lebih baru
+    dari store) dan export. Perubahan per baris ditulis ke journal
+    append-only dan digabung ke store saat compact().
+
+    Beberapa instance aplikasi bisa memakai store yang sama. Semua penulisan
+    (append, compact, import) memegang lock file {store}.lock, dan setiap
+    store ditulis ulang counter generasi di {store}.gen dinaikkan. Compact
+    selalu dibangun dari isi disk (store + seluruh journal), bukan dari
+    DataFrame di memori, sehingga entry instance lain tidak hilang.
+    """
+    def __init__(self, excel_path, store_path=None, compact_threshold=200):
+        self.excel_path = excel_path
+        self.store_path = store_path or os.path.splitext(excel_path)[0] + ".pkl"
+        self.journal_path = f"{self.store_path}.journal"
+        self.lock_path = f"{self.store_path}.lock"
+        self.generation_path = f"{self.store_path}.gen"
+        self.compact_threshold = compact_threshold
+        self.journal_entries = 0
+        self._lock = threading.Lock()
+        self._compact_thread = None
+
+    def is_stale(self):
+        """True jika store belum ada atau XLSX lebih baru dari store"""
+        if not os.path.exists(self.store_path):
+            return True
+        if not os.path.exists(self.excel_path):
+            return False
+        return os.path.getmtime(self.excel_path) > os.path.getmtime(self.store_path)
+
+    def generation(self):
+        """Counter generasi di file .gen, naik setiap kali store ditulis ulang"""
+        try:
+            with open(self.generation_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def load(self):
+        """Load katalog, import ulang dari XLSX jika store sudah basi"""
+        with FileLock(self.lock_path):
+            if self.is_stale():
+                if os.path.exists(self.excel_path):
+                    return self._import_excel()
+                return self.replay(pd.DataFrame(columns=BOOK_COLUMNS))
+
+            # Store dan journal dibaca di bawah lock agar tidak terpotong compact instance lain
+            try:
+                book = pd.read_pickle(self.store_path)
+            except Exception as e:
+                print(f"Error loading book store, re-importing from Excel: {e}")
+                if os.path.exists(self.excel_path):
+                    return self._import_excel()
+                book = pd.DataFrame(columns=BOOK_COLUMNS)
+
+            return self.replay(book)
+
+    def import_excel(self):
+        """Baca XLSX lalu tulis ke store (migrasi satu kali)"""
+        with FileLock(self.lock_path):
+            return self._import_excel()
+
+    def _import_excel(self):
+        book = pd.read_excel(self.excel_path)
+        self._save(book)
+        # XLSX yang diimport menggantikan perubahan yang belum di-compact
+        self._clear_journal()
+        return book
+
+    def save(self, book):
+        """Tulis DataFrame ke store secara atomik"""
+        with FileLock(self.lock_path):
+            self._save(book)
+
+    def _save(self, book):
+        """Tulis store lalu naikkan generasi (harus di bawah lock file)"""
+        temp_path = f"{self.store_path}.tmp"
+        book.to_pickle(temp_path)
+        os.replace(temp_path, self.store_path)
+
+        temp_path = f"{self.generation_path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(str(self.generation() + 1))
+        os.replace(temp_path, self.generation_path)
+
+    def export_excel(self, book, path=None):
+        """Export DataFrame ke XLSX"""
+        path = path or self.excel_path
+        book.to_excel(path, index=False)
+
+        # Store tetap dianggap terbaru setelah export ke file XLSX utama
+        if path == self.excel_path and os.path.exists(self.store_path):
+            os.utime(self.store_path, None)
+        return path
+
+    # =============================== JOURNAL ===============================
+
+    def append(self, op, isbn, data=None):
+        """Tambahkan satu perubahan (add/update/delete) ke journal"""
+        entry = {"op": op, "isbn": str(isbn)}
+        if data is not None:
+            entry["data"] = data
+        line = json.dumps(entry, default=_json_default) + "\n"
+
+        with FileLock(self.lock_path), self._lock:
+            with open(self.journal_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.journal_entries += 1
+
+    def replay(self, book):
+        """Terapkan ulang isi journal ke DataFrame hasil load"""
+        self.journal_entries = 0
+        if not os.path.exists(self.journal_path):
+            return book
+
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Baris terakhir bisa terpotong jika aplikasi crash saat menulis
+                    continue
+                book = self.apply(book, entry)
+                self.journal_entries += 1
+        return book
+
+    @staticmethod
+    def apply(book, entry):
+        """Terapkan satu entry journal. Aman diulang (idempotent)."""
+        isbn = entry.get("isbn")
+        data = entry.get("data") or {}
+        mask = book['ISBN'].astype(str) == isbn if 'ISBN' in book.columns else None
+
+        if entry.get("op") == "delete":
+            if mask is not None and mask.any():
+                book = book[~mask].reset_index(drop=True)
+        elif mask is not None and mask.any():
+            idx = mask.idxmax()
+            for column, value in data.items():
+                if column in book.columns:
+                    book.at[idx, column] = value
+        elif entry.get("op") == "add":
+            book = pd.concat([book, pd.DataFrame([data])], ignore_index=True)
+        return book
+
+    def clear_journal(self):
+        """Kosongkan journal"""
+        with FileLock(self.lock_path):
+            self._clear_journal()
+
+    def _clear_journal(self):
+        with self._lock:
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self.journal_entries = 0
+
+    def needs_compaction(self):
+        return self.journal_entries >= self.compact_threshold
+
+    def compact(self, background=False):
+        """Gabungkan journal ke store
+
+        Dibangun dari store dan journal di disk di bawah lock file, jadi
+        entry dari instance lain ikut masuk. Semua perubahan di memori sudah
+        tercatat di journal lewat append(), DataFrame tidak perlu dikirim.
+        Bisa dijalankan di thread terpisah (background=True).
+        """
+        if self._compact_thread is not None and self._compact_thread.is_alive():
+            if background:
+                return
+            self._compact_thread.join()
+
+        if background:
+            self._compact_thread = threading.Thread(target=self._compact_in_background, daemon=True)
+            self._compact_thread.start()
+        else:
+            self._compact_from_disk()
+
+    def _compact_in_background(self):
+        try:
+            self._compact_from_disk()
+        except Exception as e:
+            print(f"Error compacting book journal: {e}")
+
+    def _compact_from_disk(self):
+        with FileLock(self.lock_path):
+            if not os.path.exists(self.journal_path):
+                self.journal_entries = 0
+                return
+            try:
+                book = pd.read_pickle(self.store_path)
+            except FileNotFoundError:
+                book = pd.DataFrame(columns=BOOK_COLUMNS)
+            # Replay seluruh journal sampai akhir, termasuk entry instance lain
+            book = self.replay(book)
+            self._save(book)
+            self._clear_journal()
+
+    def close(self):
+        """Compact journal sebelum aplikasi ditutup"""
+        if self.journal_entries:
+            self.compact()
+        elif self._compact_thread is not None:
+            self._compact_thread.join()
+
+
+def _sql_value(value):
+    """Konversi nilai DataFrame ke tipe yang diterima sqlite3"""
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    if not isinstance(value, (int, float, str, bytes)):
+        return None if pd.isna(value) else str(value)
+    return value
+
+
+class SqliteBookStore:
+    """Katalog buku di tabel SQLite, API sama dengan BookStore.
+
+    Perubahan per baris langsung ditulis sebagai INSERT/UPDATE/DELETE,
+    jadi tidak ada journal yang perlu di-compact.
+    """
+    def __init__(self, database, excel_path):
+        self.database = database
+        self.excel_path = excel_path
+        self.store_path = database.path
+        self.journal_entries = 0
+
+        columns = ", ".join(f'"{column}"' for column in BOOK_COLUMNS)
+        self.database.execute(
+            f'CREATE TABLE IF NOT EXISTS books (id INTEGER PRIMARY KEY AUTOINCREMENT, isbn_key TEXT, {columns})'
+        )
+        self.database.execute('CREATE INDEX IF NOT EXISTS idx_books_isbn ON books (isbn_key)')
+        self.database.execute('CREATE INDEX IF NOT EXISTS idx_books_status ON books ("Status")')
+        self.database.execute('CREATE INDEX IF NOT EXISTS idx_books_kategori ON books ("Kategori")')
+        self.database.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    def _meta(self, key):
+        row = self.database.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _setMeta(self, key, value):
+        self.database.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    def _row(self, record):
+        isbn = _sql_value(record.get('ISBN'))
+        return [None if isbn is None else str(isbn)] + [_sql_value(record.get(column)) for column in BOOK_COLUMNS]
+
+    def is_stale(self):
+        """True jika tabel masih kosong atau XLSX lebih baru dari import terakhir"""
+        if self.database.execute('SELECT 1 FROM books LIMIT 1').fetchone() is None:
+            return True
+        if not os.path.exists(self.excel_path):
+            return False
+        imported = self._meta('excel_mtime')
+        return imported is None or os.path.getmtime(self.excel_path) > float(imported)
+
+    def load(self):
+        """Load katalog, import ulang dari XLSX jika sudah basi"""
+        if self.is_stale() and os.path.exists(self.excel_path):
+            return self.import_excel()
+
+        columns = ", ".join(f'"{column}"' for column in BOOK_COLUMNS)
+        rows = self.database.execute(f'SELECT {columns} FROM books ORDER BY id').fetchall()
+        return pd.DataFrame(rows, columns=BOOK_COLUMNS)
+
+    def import_excel(self):
+        """Baca XLSX lalu tulis ke tabel books"""
+        return self.import_frame(pd.read_excel(self.excel_path))
+
+    def import_frame(self, book):
+        """Ganti isi tabel books dengan DataFrame, dicatat sebagai hasil import"""
+        self.save(book)
+        if os.path.exists(self.excel_path):
+            self._setMeta('excel_mtime', os.path.getmtime(self.excel_path))
+        return book
+
+    def save(self, book):
+        """Tulis ulang seluruh tabel books dalam satu transaksi"""
+        records = book.to_dict('records')
+        placeholders = ", ".join("?" for _ in range(len(BOOK_COLUMNS) + 1))
+        columns = ", ".join(f'"{column}"' for column in BOOK_COLUMNS)
+        with self.database.transaction() as connection:
+            connection.execute('DELETE FROM books')
+            connection.executemany(
+                f'INSERT INTO books (isbn_key, {columns}) VALUES ({placeholders})',
+                [self._row(record) for record in records]
+            )
+
+    def export_excel(self, book, path=None):
+        """Export DataFrame ke XLSX"""
+        path = path or self.excel_path
+        book.to_excel(path, index=False)
+
+        # Database tetap dianggap terbaru setelah export ke file XLSX utama
+        if path == self.excel_path:
+            self._setMeta('excel_mtime', os.path.getmtime(path))
+        return path
+
+    def append(self, op, isbn, data=None):
+        """Terapkan satu perubahan (add/update/delete) langsung ke tabel"""
+        data = data or {}
+        if op == "delete":
+            self.database.execute('DELETE FROM books WHERE isbn_key = ?', (str(isbn),))
+            return
+
+        columns = [column for column in BOOK_COLUMNS if column in data]
+        if op == "add":
+            names = ", ".join(f'"{column}"' for column in columns)
+            placeholders = ", ".join("?" for _ in range(len(columns) + 1))
+            self.database.execute(
+                f'INSERT INTO books (isbn_key{", " if names else ""}{names}) VALUES ({placeholders})',
+                [str(data.get('ISBN', isbn))] + [_sql_value(data[column]) for column in columns]
+            )
+        elif columns:
+            # Seperti BookStore.apply: hanya baris pertama dengan ISBN tersebut
+            assignments = ", ".join(f'"{column}" = ?' for column in columns)
+            self.database.execute(
+                f'UPDATE books SET isbn_key = ?, {assignments} '
+                f'WHERE id = (SELECT id FROM books WHERE isbn_key = ? ORDER BY id LIMIT 1)',
+                [str(data.get('ISBN', isbn))] + [_sql_value(data[column]) for column in columns] + [str(isbn)]
+            )
+
+    def clear_journal(self):
+        pass
+
+    def needs_compaction(self):
+        return False
+
+    def compact(self, background=False):
+        """Perubahan sudah langsung ditulis per baris, cukup checkpoint WAL"""
+        if not background:
+            self.database.execute('PRAGMA wal_checkpoint(PASSIVE)')
+
+    def close(self):
+        """Checkpoint WAL sebelum aplikasi ditutup"""
+        self.database.execute('PRAGMA wal_checkpoint(TRUNCATE)')
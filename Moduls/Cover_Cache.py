@@ -0,0 +1,197 @@
+import os
+import glob
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+
+class ThumbnailCache:
+    """Cache thumbnail cover di disk.
+
+    Thumbnail disimpan dengan nama {ISBN}_{lebar}x{tinggi}_{mtime}.jpeg sehingga
+    otomatis tidak terpakai lagi ketika file cover sumber berubah.
+    """
+    def __init__(self, cover_dir, default_image=None, cache_dir=None):
+        self.cover_dir = cover_dir
+        self.default_image = default_image
+        self.cache_dir = cache_dir or os.path.join(cover_dir, ".thumbs")
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def source_path(self, isbn):
+        """Path cover asli, atau default image jika cover tidak ada"""
+        if isbn:
+            path = os.path.join(self.cover_dir, f"{isbn}.jpeg")
+            if os.path.exists(path):
+                return path
+        return self.default_image
+
+    def thumbnail_path(self, key, size, mtime_ns):
+        return os.path.join(self.cache_dir, f"{key}_{size[0]}x{size[1]}_{mtime_ns}.jpeg")
+
+    def get(self, isbn, size):
+        """Ambil thumbnail PIL dengan ukuran tertentu, dibuat sekali lalu dipakai ulang"""
+        source = self.source_path(isbn)
+        if not source:
+            raise FileNotFoundError(f"Cover untuk ISBN {isbn} tidak ditemukan")
+
+        key = isbn if source != self.default_image else "default"
+        thumb_path = self.thumbnail_path(key, size, os.stat(source).st_mtime_ns)
+
+        if os.path.exists(thumb_path):
+            try:
+                img = Image.open(thumb_path)
+                img.load()
+                return img
+            except Exception as e:
+                print(f"Error reading thumbnail, regenerating: {e}")
+
+        img = Image.open(source)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        img = img.resize(size, Image.LANCZOS)
+
+        # Hapus thumbnail lama (mtime berbeda) lalu simpan yang baru
+        self.invalidate(key, size)
+        try:
+            temp_path = f"{thumb_path}.{threading.get_ident()}.tmp"
+            img.save(temp_path, "JPEG", quality=90)
+            os.replace(temp_path, thumb_path)
+        except Exception as e:
+            print(f"Error saving thumbnail: {e}")
+        return img
+
+    def invalidate(self, isbn, size=None):
+        """Hapus thumbnail milik ISBN (semua ukuran jika size tidak diberikan)"""
+        size_pattern = f"{size[0]}x{size[1]}" if size else "*"
+        for path in glob.glob(os.path.join(self.cache_dir, f"{glob.escape(str(isbn))}_{size_pattern}_*.jpeg")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class ImageLRU:
+    """Cache LRU di memori untuk cover yang sudah di-decode.
+
+    Key (ISBN, ukuran), dibatasi total byte perkiraan dari piksel gambar.
+    """
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._items = OrderedDict()   # key -> (value, bytes)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def estimate_bytes(size):
+        # RGBA per piksel, cukup untuk membatasi pemakaian memori
+        return size[0] * size[1] * 4
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key, value, size):
+        nbytes = self.estimate_bytes(size)
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._items[key] = (value, nbytes)
+            self.current_bytes += nbytes
+
+            # Buang item yang paling lama tidak dipakai sampai di bawah budget
+            while self.current_bytes > self.max_bytes and self._items:
+                _, (_, evicted_bytes) = self._items.popitem(last=False)
+                self.current_bytes -= evicted_bytes
+
+    def discard(self, isbn):
+        """Hapus semua ukuran cover milik ISBN"""
+        with self._lock:
+            for key in [key for key in self._items if key[0] == isbn]:
+                _, nbytes = self._items.pop(key)
+                self.current_bytes -= nbytes
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.current_bytes = 0
+
+
+class CoverLoader:
+    """Decode cover di thread pool tanpa memblokir main thread Tk.
+
+    Hasil dikumpulkan di queue lalu diteruskan ke callback dari main thread
+    lewat widget.after(). Setiap halaman memakai generasi baru; pekerjaan dari
+    generasi lama dibatalkan dan hasilnya dibuang.
+    """
+    def __init__(self, widget, decode, max_workers=4, poll_interval=30):
+        self.widget = widget
+        self.decode = decode
+        self.poll_interval = poll_interval
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cover")
+        self.results = queue.Queue()
+        self.generation = 0
+        self.pending = set()
+        self._poll_job = None
+
+    def new_generation(self):
+        """Batalkan semua request yang belum selesai, mulai generasi baru"""
+        for future in list(self.pending):
+            future.cancel()
+        self.pending.clear()
+        self.generation += 1
+        return self.generation
+
+    def request(self, isbn, size, callback):
+        """Minta cover di-decode, callback(img) dipanggil di main thread"""
+        future = self.executor.submit(self._work, self.generation, isbn, size, callback)
+        self.pending.add(future)
+        self._schedule_poll()
+        return future
+
+    def _work(self, generation, isbn, size, callback):
+        if generation != self.generation:
+            return
+        try:
+            img = self.decode(isbn, size)
+        except Exception as e:
+            print(f"Error loading cover in background: {e}")
+            img = None
+        self.results.put((generation, callback, img))
+
+    def _schedule_poll(self):
+        if self._poll_job is None:
+            self._poll_job = self.widget.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Jalankan callback untuk hasil yang sudah selesai (di main thread)"""
+        self._poll_job = None
+        while True:
+            try:
+                generation, callback, img = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if generation == self.generation and img is not None:
+                try:
+                    callback(img)
+                except Exception as e:
+                    print(f"Error applying cover: {e}")
+
+        self.pending = {future for future in self.pending if not future.done()}
+        if self.pending or not self.results.empty():
+            self._schedule_poll()
+
+    def shutdown(self):
+        self.new_generation()
+        if self._poll_job is not None:
+            self.widget.after_cancel(self._poll_job)
+            self._poll_job = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+# Kolom yang bisa difilter lewat bitmap
+FACET_COLUMNS = ('Kategori', 'Tahun', 'Status', 'Category')
+
+
+def facet_key(value):
+    """Normalisasi nilai facet: 2005, 2005.0 dan "2005" dianggap sama"""
+    if value is None or value != value:  # None atau NaN
+        return None
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        value = int(value)
+    return str(value)
+
+
+class FacetIndex:
+    """Index bitmap untuk filter katalog.
+
+    Setiap kolom disimpan sebagai kode kategori per baris, dan setiap nilai
+    punya bitmap (bit per baris, dipack dengan np.packbits). Filter beberapa
+    facet digabung dengan AND, beberapa nilai dalam satu facet dengan OR.
+    """
+    def __init__(self, columns=FACET_COLUMNS):
+        self.columns = columns
+        self.size = 0
+        self.capacity = 0    # jumlah baris yang muat di array kode/bitmap
+        self.codes = {}      # kolom -> array kode per baris
+        self.lookup = {}     # kolom -> {nilai: kode}
+        self.bitmaps = {}    # kolom -> [bitmap per kode]
+
+    def _emptyBitmap(self, capacity=None):
+        capacity = self.capacity if capacity is None else capacity
+        return np.zeros((capacity + 7) // 8, dtype=np.uint8)
+
+    def build(self, books):
+        """Bangun ulang semua bitmap dari DataFrame buku"""
+        self.size = self.capacity = len(books)
+        self.codes = {}
+        self.lookup = {}
+        self.bitmaps = {}
+        for column in self.columns:
+            if column not in books.columns:
+                continue
+            keys = [facet_key(value) for value in books[column].tolist()]
+            codes, uniques = pd.factorize(pd.Series(keys, dtype=object), use_na_sentinel=False)
+            codes = codes.astype(np.int32)
+            self.codes[column] = codes
+            self.lookup[column] = {key: code for code, key in enumerate(uniques)}
+
+            # Urutkan baris per kode sekali, lalu pack bitmap per nilai
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            bitmaps = []
+            for code in range(len(uniques)):
+                bits = np.zeros(self.size, dtype=bool)
+                bits[order[bounds[code]:bounds[code + 1]]] = True
+                bitmaps.append(np.packbits(bits))
+            self.bitmaps[column] = bitmaps
+
+    def _setBit(self, bitmap, position, on):
+        byte, bit = divmod(position, 8)
+        if on:
+            bitmap[byte] |= np.uint8(0x80 >> bit)
+        else:
+            bitmap[byte] &= np.uint8(~(0x80 >> bit) & 0xFF)
+
+    def _codeFor(self, column, key):
+        """Kode untuk nilai, buat bitmap baru jika nilai belum pernah ada"""
+        code = self.lookup[column].get(key)
+        if code is None:
+            code = self.lookup[column][key] = len(self.bitmaps[column])
+            self.bitmaps[column].append(self._emptyBitmap())
+        return code
+
+    def _grow(self, capacity):
+        """Perbesar semua bitmap dan array kode (kapasitas dilipatgandakan)"""
+        for column, bitmaps in self.bitmaps.items():
+            for code, bitmap in enumerate(bitmaps):
+                grown = self._emptyBitmap(capacity)
+                grown[:len(bitmap)] = bitmap
+                bitmaps[code] = grown
+            codes = np.full(capacity, -1, dtype=np.int32)
+            codes[:len(self.codes[column])] = self.codes[column]
+            self.codes[column] = codes
+        self.capacity = capacity
+
+    def append(self, record):
+        """Tambahkan satu baris di posisi terakhir"""
+        position = self.size
+        if position >= self.capacity:
+            self._grow(max(16, (position + 1) * 2))
+        self.size += 1
+        self.update(position, record)
+
+    def update(self, position, record):
+        """Perbarui bitmap satu baris untuk kolom yang ada di record"""
+        for column in self.bitmaps:
+            if column not in record:
+                continue
+            new_code = self._codeFor(column, facet_key(record[column]))
+            old_code = self.codes[column][position]
+            if old_code == new_code:
+                continue
+            if old_code >= 0:
+                self._setBit(self.bitmaps[column][old_code], position, False)
+            self._setBit(self.bitmaps[column][new_code], position, True)
+            self.codes[column][position] = new_code
+
+    def bitmap(self, **facets):
+        """Bitmap hasil filter (masih dipack), None jika tidak ada facet"""
+        result = None
+        for column, values in facets.items():
+            if values is None:
+                continue
+            if column not in self.bitmaps:
+                raise KeyError(f"Kolom {column} tidak diindex")
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+
+            # OR antar nilai dalam satu facet
+            combined = self._emptyBitmap()
+            for value in values:
+                code = self.lookup[column].get(facet_key(value))
+                if code is not None:
+                    combined |= self.bitmaps[column][code]
+
+            # AND antar facet
+            result = combined if result is None else result & combined
+        return result
+
+    def mask(self, **facets):
+        """Array boolean sepanjang katalog untuk filter yang diberikan"""
+        packed = self.bitmap(**facets)
+        if packed is None:
+            return np.ones(self.size, dtype=bool)
+        return np.unpackbits(packed, count=self.size).view(bool)
+
+    def positions(self, **facets):
+        """Posisi baris yang lolos filter"""
+        return np.flatnonzero(self.mask(**facets))
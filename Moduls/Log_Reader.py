@@ -0,0 +1,281 @@
+import os
+import json
+import gzip
+import hashlib
+from collections import Counter
+from datetime import date, datetime
+
+from Moduls.Access_Log import list_segments
+
+INDEX_DIR = ".index"
+
+
+def _bound(value, upper=False):
+    """Batas waktu (str/date/datetime) -> string 'YYYY-MM-DD HH:MM:SS' yang bisa dibandingkan"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        value = value.isoformat()
+    value = str(value).strip()
+    if len(value) == 10:  # hanya tanggal, ambil seluruh hari
+        return f"{value} {'23:59:59' if upper else '00:00:00'}"
+    return value
+
+
+class LogReader:
+    """Pembaca log akses (data/logs) dengan index per segmen.
+
+    Setiap segmen punya ringkasan: rentang waktu, jumlah entry, dan hitungan
+    per hari/email/role/action. Ringkasan segmen yang sudah dirotasi disimpan
+    di {directory}/.index sehingga hanya dibaca sekali; segmen aktif diindex
+    bertahap dari offset terakhir. Query melewati segmen yang tidak mungkin
+    cocok, dan agregasi memakai ringkasan langsung jika segmen tercakup penuh.
+    Entry dibaca per segmen, tidak pernah seluruh riwayat sekaligus.
+    """
+    def __init__(self, directory, name="access", legacy_file=None):
+        self.directory = directory
+        self.name = name
+        self.legacy_file = legacy_file     # logs.json lama, dibaca sebagai segmen tertua
+        self.index_dir = os.path.join(directory, INDEX_DIR)
+        self.active_path = os.path.join(directory, f"{name}.jsonl")
+        self._summaries = {}               # path -> ringkasan (cache di memori)
+        self._rotated = None               # segmen rotasi saat scan terakhir
+
+    # ---- Membaca segmen ----
+
+    def _paths(self):
+        paths = list_segments(self.directory, self.name) if os.path.isdir(self.directory) else []
+        if self.legacy_file and os.path.exists(self.legacy_file):
+            paths.insert(0, self.legacy_file)
+        return paths
+
+    def _head(self, path):
+        """Hash baris pertama segmen, identitas file selain inode (inode bisa dipakai ulang)"""
+        try:
+            with open(path, "rb") as f:
+                return hashlib.sha1(f.readline(4096)).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def _signature(self, path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def _readLines(self, path, offset=0):
+        """Yield (offset akhir, entry) dari segmen JSON Lines mulai offset tertentu"""
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # baris terakhir yang sedang ditulis
+                offset += len(line)
+                try:
+                    yield offset, json.loads(line)
+                except ValueError:
+                    continue
+
+    def _entries(self, path):
+        """Semua entry satu segmen"""
+        try:
+            if path == self.legacy_file:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                return data if isinstance(data, list) else []
+            return [entry for _, entry in self._readLines(path)]
+        except FileNotFoundError:
+            return []  # segmen baru saja dirotasi/dikompres
+
+    # ---- Index per segmen ----
+
+    def _emptySummary(self):
+        return {"signature": None, "head": None, "offset": 0, "first": None, "last": None, "count": 0,
+                "days": {}, "users": {}, "roles": {}, "actions": {}}
+
+    def _addToSummary(self, summary, entry):
+        timestamp = str(entry.get("timestamp", ""))
+        if summary["first"] is None or timestamp < summary["first"]:
+            summary["first"] = timestamp
+        if summary["last"] is None or timestamp > summary["last"]:
+            summary["last"] = timestamp
+        summary["count"] += 1
+        for field, value in (("days", timestamp[:10]), ("users", entry.get("email")),
+                             ("roles", entry.get("role")), ("actions", entry.get("action"))):
+            value = str(value)
+            summary[field][value] = summary[field].get(value, 0) + 1
+
+    def _indexPath(self, path):
+        return os.path.join(self.index_dir, f"{os.path.basename(path)}.idx.json")
+
+    def _summary(self, path):
+        """Ringkasan segmen, dibangun ulang hanya jika segmen berubah"""
+        try:
+            signature = self._signature(path)
+        except FileNotFoundError:
+            return None
+
+        summary = self._summaries.get(path)
+        if summary is not None and summary["signature"] == signature:
+            return summary
+
+        rotated = path not in (self.active_path, self.legacy_file)
+        if summary is None and rotated:
+            try:
+                with open(self._indexPath(path), "r") as f:
+                    summary = json.load(f)
+                if summary.get("signature") != signature:
+                    summary = None
+            except (FileNotFoundError, ValueError):
+                summary = None
+            if summary is not None:
+                self._summaries[path] = summary
+                return summary
+
+        appended = (summary is not None and summary["signature"][2] == signature[2]
+                    and signature[0] >= summary["offset"])
+        if path == self.active_path and appended and summary["offset"]:
+            # Inode sama belum tentu file yang sama, cocokkan juga baris pertamanya
+            appended = self._head(path) == summary.get("head")
+        if path == self.active_path and appended:
+            # File yang sama dan hanya bertambah, lanjutkan dari offset terakhir
+            offset = summary["offset"]
+        else:
+            summary = self._emptySummary()
+            offset = 0
+
+        try:
+            if path == self.legacy_file:
+                for entry in self._entries(path):
+                    self._addToSummary(summary, entry)
+            else:
+                for offset, entry in self._readLines(path, offset):
+                    self._addToSummary(summary, entry)
+        except FileNotFoundError:
+            return None
+        if path == self.active_path and not summary.get("head") and offset:
+            summary["head"] = self._head(path)
+        summary["offset"] = offset
+        summary["signature"] = signature
+        self._summaries[path] = summary
+
+        if rotated:
+            try:
+                os.makedirs(self.index_dir, exist_ok=True)
+                temp_path = f"{self._indexPath(path)}.tmp"
+                with open(temp_path, "w") as f:
+                    json.dump(summary, f)
+                os.replace(temp_path, self._indexPath(path))
+            except OSError as e:
+                print(f"Error saving log index: {e}")
+        return summary
+
+    def _prune(self, paths):
+        """Buang ringkasan dan file index milik segmen yang sudah tidak ada"""
+        for path in set(self._summaries) - set(paths):
+            del self._summaries[path]
+        if not os.path.isdir(self.index_dir):
+            return
+        names = {os.path.basename(path) for path in paths}
+        for filename in os.listdir(self.index_dir):
+            if filename.endswith(".idx.json") and filename[:-len(".idx.json")] not in names:
+                try:
+                    os.remove(os.path.join(self.index_dir, filename))
+                except OSError as e:
+                    print(f"Error removing log index: {e}")
+
+    def segments(self):
+        """[(path, ringkasan)] dari segmen tertua ke terbaru"""
+        result = []
+        paths = self._paths()
+        rotated = [path for path in paths if path not in (self.active_path, self.legacy_file)]
+        if rotated != self._rotated:
+            # Ada rotasi sejak scan terakhir, segmen aktif adalah file baru
+            self._summaries.pop(self.active_path, None)
+            self._rotated = rotated
+            self._prune(paths)
+        for path in paths:
+            summary = self._summary(path)
+            if summary is not None and summary["count"]:
+                result.append((path, summary))
+        return result
+
+    # ---- Query ----
+
+    def _mayMatch(self, summary, start, end, email, role, action):
+        if start is not None and summary["last"] < start:
+            return False
+        if end is not None and summary["first"] > end:
+            return False
+        for field, value in (("users", email), ("roles", role), ("actions", action)):
+            if value is not None and str(value) not in summary[field]:
+                return False
+        return True
+
+    def _covers(self, summary, start, end):
+        """Seluruh segmen berada di dalam rentang waktu"""
+        return (start is None or summary["first"] >= start) and (end is None or summary["last"] <= end)
+
+    def _matches(self, entry, start, end, email, role, action):
+        timestamp = str(entry.get("timestamp", ""))
+        if start is not None and timestamp < start:
+            return False
+        if end is not None and timestamp > end:
+            return False
+        return ((email is None or entry.get("email") == email)
+                and (role is None or entry.get("role") == role)
+                and (action is None or entry.get("action") == action))
+
+    def query(self, start=None, end=None, email=None, role=None, action=None, limit=None, newest_first=True):
+        """Entry yang cocok dengan filter, dibaca segmen per segmen (generator)"""
+        start, end = _bound(start), _bound(end, upper=True)
+        segments = self.segments()
+        if newest_first:
+            segments.reverse()
+
+        found = 0
+        for path, summary in segments:
+            if not self._mayMatch(summary, start, end, email, role, action):
+                continue
+            entries = [entry for entry in self._entries(path) if self._matches(entry, start, end, email, role, action)]
+            if newest_first:
+                entries.sort(key=lambda entry: str(entry.get("timestamp", "")), reverse=True)
+            for entry in entries:
+                yield entry
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+
+    def _aggregate(self, field, key, start, end, email, role, action):
+        start, end = _bound(start), _bound(end, upper=True)
+        counts = Counter()
+        for path, summary in self.segments():
+            if not self._mayMatch(summary, start, end, email, role, action):
+                continue
+            # Ringkasan cukup jika tidak ada filter lain dan segmen tercakup penuh
+            onlyAction = action is None or set(summary["actions"]) == {str(action)}
+            if email is None and role is None and onlyAction and self._covers(summary, start, end):
+                counts.update(summary[field])
+                continue
+            for entry in self._entries(path):
+                if self._matches(entry, start, end, email, role, action):
+                    counts[key(entry)] += 1
+        return counts
+
+    def logins_per_day(self, start=None, end=None, email=None, role=None):
+        """{'YYYY-MM-DD': jumlah login} terurut berdasarkan tanggal"""
+        counts = self._aggregate("days", lambda entry: str(entry.get("timestamp", ""))[:10],
+                                 start, end, email, role, "login")
+        return dict(sorted(counts.items()))
+
+    def logins_per_user(self, start=None, end=None, role=None):
+        """{email: jumlah login} terurut dari yang paling sering"""
+        counts = self._aggregate("users", lambda entry: str(entry.get("email")),
+                                 start, end, None, role, "login")
+        return dict(counts.most_common())
+
+    def total(self, start=None, end=None, email=None, role=None, action=None):
+        """Jumlah entry yang cocok"""
+        return sum(self._aggregate("actions", lambda entry: str(entry.get("action")),
+                                   start, end, email, role, action).values())
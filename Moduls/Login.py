@@ -1,31 +1,159 @@
-import json
 import os
+import sys
+import hmac
+import base64
+import hashlib
+import secrets
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Moduls.Repository import Repository
+from Moduls.Access_Log import AccessLog
+
+# Password disimpan sebagai pbkdf2_sha256$iterasi$salt$hash (base64)
+PASSWORD_SCHEME = "pbkdf2_sha256"
+PBKDF2_ITERATIONS = 200_000
+
+
+def hash_password(password, iterations=PBKDF2_ITERATIONS, salt=None):
+    """Hash password dengan PBKDF2-HMAC-SHA256"""
+    salt = salt or secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return "$".join([PASSWORD_SCHEME, str(iterations),
+                     base64.b64encode(salt).decode("ascii"), base64.b64encode(digest).decode("ascii")])
+
+
+def is_hashed(stored):
+    return isinstance(stored, str) and stored.startswith(PASSWORD_SCHEME + "$")
+
+
+def verify_password(password, stored, iterations=PBKDF2_ITERATIONS):
+    """Cocokkan password dengan hash tersimpan.
+
+    Returns (cocok, perlu_hash_ulang). Password lama yang masih plaintext
+    atau hash dengan iterasi lebih rendah ditandai perlu di-hash ulang.
+    """
+    if not is_hashed(stored):
+        return hmac.compare_digest(str(stored).encode("utf-8"), password.encode("utf-8")), True
+
+    _, rounds, salt, expected = stored.split("$")
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), base64.b64decode(salt), int(rounds))
+    matched = hmac.compare_digest(digest, base64.b64decode(expected))
+    return matched, matched and int(rounds) < iterations
+
 
 class AuthManager:
-    def __init__(self):
+    def __init__(self, repository=None, access_log=None, iterations=PBKDF2_ITERATIONS):
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
         self.users_file = os.path.join(self.data_dir, "users.json")
+        # logs.json lama tidak ditulis lagi, login baru masuk ke data/logs/access.jsonl
         self.logs_file = os.path.join(self.data_dir, "logs.json")
+        self.iterations = iterations
         
         os.makedirs(self.data_dir, exist_ok=True)
+        # Data user lewat repository (users.json atau tabel SQLite)
+        self.users = (repository or Repository(self.data_dir)).collection("users")
+        self.access_log = access_log or AccessLog(os.path.join(self.data_dir, "logs"))
+        
+        # Direktori user di memori, dibangun ulang jika koleksi berubah (mtime users.json)
+        self._directory = {}
+        self._directoryRevision = None
+        self._lock = threading.RLock()
+        
+        # Cache verifikasi: email -> (hash tersimpan, HMAC password dengan key per proses),
+        # login berikutnya dengan password yang sama tidak perlu menjalankan KDF lagi
+        self._verified = {}
+        self._cacheKey = secrets.token_bytes(32)
+        
+        # KDF dijalankan di worker ini agar thread Tk tidak terblokir
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="auth")
+        # Migrasi massal punya thread sendiri agar tidak mengantre di depan login/register
+        self.migration = None
+        
         self._initialize_files()
     
     def _initialize_files(self):
-        """Initialize users and logs files if they don't exist"""
-        if not os.path.exists(self.users_file):
-            with open(self.users_file, 'w') as f:
-                json.dump({
-                    "admin@bookku.com": {
-                        "name": "Administrator",
-                        "password": "admin1234",
-                        "role": "admin"
-                    }
-                }, f, indent=4)
-        
-        if not os.path.exists(self.logs_file):
-            with open(self.logs_file, 'w') as f:
-                json.dump([], f, indent=4)
+        """Initialize the users store and migrate plaintext passwords"""
+        self.users.ensure()
+        if not self.users.all():
+            self.users.insert({
+                "email": "admin@bookku.com",
+                "name": "Administrator",
+                "password": hash_password("admin1234", self.iterations),
+                "role": "admin"
+            })
+        
+        if any(not is_hashed(user.get("password")) for user in self.directory().values()):
+            self.migration = threading.Thread(target=self.migrate_passwords, name="auth-migrate", daemon=True)
+            self.migration.start()
+    
+    def directory(self):
+        """{email: user} dari memori, dimuat ulang hanya jika data user berubah"""
+        with self._lock:
+            revision = self.users.revision()
+            if revision != self._directoryRevision:
+                self._directory = {user["email"]: user for user in self.users.all()}
+                self._directoryRevision = revision
+            return self._directory
+    
+    def run_async(self, widget, callback, func, *args, poll_interval=30):
+        """Jalankan func(*args) di worker, callback(hasil) dipanggil di thread Tk lewat widget.after()"""
+        future = self.executor.submit(func, *args)
+        
+        def poll():
+            if not future.done():
+                widget.after(poll_interval, poll)
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error in authentication worker: {e}")
+                result = (False, f"Unexpected error: {e}", None)
+            callback(result)
+        
+        widget.after(poll_interval, poll)
+        return future
+    
+    def _cacheDigest(self, stored, password):
+        return hmac.new(self._cacheKey, f"{stored}\0{password}".encode("utf-8"), hashlib.sha256).digest()
+    
+    def check_password(self, email, password):
+        """Verifikasi password user, hash ulang (migrasi) jika masih plaintext"""
+        user = self.directory().get(email)
+        if user is None:
+            return None
+        
+        stored = user.get("password", "")
+        cached = self._verified.get(email)
+        if cached and cached[0] == stored and hmac.compare_digest(cached[1], self._cacheDigest(stored, password)):
+            return user
+        
+        matched, needs_rehash = verify_password(password, stored, self.iterations)
+        if not matched:
+            return None
+        
+        if needs_rehash:
+            new_hash = hash_password(password, self.iterations)
+            if self.users.update(dict(user, password=new_hash), where={"password": stored}):
+                stored = new_hash
+        self._verified[email] = (stored, self._cacheDigest(stored, password))
+        return user
+    
+    def migrate_passwords(self):
+        """Hash semua password yang masih plaintext. Returns jumlah user yang dimigrasi."""
+        migrated = 0
+        for user in list(self.directory().values()):
+            stored = user.get("password")
+            if is_hashed(stored) or stored is None:
+                continue
+            updated = dict(user, password=hash_password(str(stored), self.iterations))
+            # where: jangan timpa jika password diganti/dimigrasi proses lain
+            if self.users.update(updated, where={"password": stored}):
+                migrated += 1
+        return migrated
     
     def register(self, name, email, password):
         """Register a new user"""
@@ -42,22 +170,19 @@ class AuthManager:
             return False, "Please enter a valid email address"
         
         # Check if email already exists
-        with open(self.users_file, 'r') as f:
-            users = json.load(f)
-        
-        if email in users:
+        if email in self.directory():
             return False, "Email already registered"
         
-        # Add new user
-        users[email] = {
+        # Add new user (unique: another client may have registered the same email meanwhile)
+        created = self.users.insert({
+            "email": email,
             "name": name,
-            "password": password,
+            "password": hash_password(password, self.iterations),
             "role": "user"  # Default role is user
-        }
-        
-        with open(self.users_file, 'w') as f:
-            json.dump(users, f, indent=4)
+        }, unique=True)
         
+        if not created:
+            return False, "Email already registered"
         return True, "Account created successfully"
     
     def login(self, email, password):
@@ -66,37 +191,40 @@ class AuthManager:
             return False, "Please enter both email and password", None
         
         # Check credentials
-        with open(self.users_file, 'r') as f:
-            users = json.load(f)
+        user = self.check_password(email, password)
         
-        if email not in users or users[email]["password"] != password:
+        if user is None:
             return False, "Invalid email or password", None
         
         # Log successful login
-        self._log_login(email, users[email]["role"])
+        self._log_login(email, user["role"])
         
         # Return user info
         user_info = {
             "email": email,
-            "name": users[email]["name"],
-            "role": users[email]["role"]
+            "name": user["name"],
+            "role": user["role"]
         }
         
         return True, "Login successful", user_info
     
     def _log_login(self, email, role):
-        """Log login activity"""
+        """Log login activity (append-only, written off the UI thread)"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        with open(self.logs_file, 'r') as f:
-            logs = json.load(f)
-        
-        logs.append({
+        self.access_log.log({
             "email": email,
             "role": role,
             "action": "login",
             "timestamp": timestamp
         })
-        
-        with open(self.logs_file, 'w') as f:
-            json.dump(logs, f, indent=4)
+
+
+if __name__ == '__main__':
+    # Migrasi password plaintext: python -m Moduls.Login
+    manager = AuthManager()
+    if manager.migration is not None:
+        manager.migration.join()
+    plaintext = [email for email, user in manager.directory().items() if not is_hashed(user.get("password"))]
+    print(f"Password plaintext tersisa: {len(plaintext)}")
+    manager.access_log.close()
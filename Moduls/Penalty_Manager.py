@@ -1,17 +1,129 @@
 import json
 import time
+import heapq
 import os
 import locale
-from datetime import datetime, timedelta
+import numpy as np
+from datetime import datetime
 from typing import List, Dict, Tuple, Optional, Any
 from pathlib import Path
+from Moduls.Repository import JsonCollection, COLLECTIONS
+from Moduls.Records import Record, LoanRecord, PenaltyRecord
+
+# Field record tersimpan yang harus masih sama dengan saat dibaca agar perubahan boleh ditulis
+GUARD_FIELDS = ("status", "updated_at")
+
+
+class RecordIndex:
+    """Index dict untuk list record (LoanRecord/PenaltyRecord) berdasarkan beberapa field.
+
+    Nilai field dibandingkan sebagai string, jadi ISBN int dan str sama.
+    """
+    def __init__(self, *fields):
+        self.fields = fields
+        self.buckets: Dict[Tuple, Dict[int, Record]] = {}
+
+    def keyOf(self, *values) -> Tuple:
+        return tuple(None if value is None else str(value) for value in values)
+
+    def rebuild(self, records: List[Record]) -> None:
+        self.buckets = {}
+        for record in records:
+            self.add(record)
+
+    def add(self, record: Record) -> None:
+        key = self.keyOf(*(getattr(record, field) for field in self.fields))
+        self.buckets.setdefault(key, {})[id(record)] = record
+
+    def remove(self, record: Record) -> None:
+        key = self.keyOf(*(getattr(record, field) for field in self.fields))
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            bucket.pop(id(record), None)
+            if not bucket:
+                del self.buckets[key]
+
+    def get(self, *values) -> List[Record]:
+        return list(self.buckets.get(self.keyOf(*values), {}).values())
+
+    def first(self, *values) -> Optional[Record]:
+        bucket = self.buckets.get(self.keyOf(*values))
+        return next(iter(bucket.values())) if bucket else None
+
+
+class LoanTable:
+    """Snapshot loan dalam bentuk array NumPy untuk perhitungan batch.
+
+    Dibangun ulang dari self.loans ketika ada loan yang berubah.
+    """
+    def __init__(self, loans: List[LoanRecord]):
+        count = len(loans)
+        self.loans = list(loans)
+        self.due = np.fromiter((loan.return_date or 0 for loan in loans), dtype=np.int64, count=count)
+        self.active = np.fromiter(
+            (loan.status == "active" and loan.return_date is not None for loan in loans), dtype=bool, count=count
+        )
+        lookup: Dict[str, int] = {}
+        self.userCodes = np.fromiter(
+            (lookup.setdefault(loan.username, len(lookup)) for loan in loans), dtype=np.int64, count=count
+        )
+        self.users = list(lookup)
+
+    def compute(self, today: int, rate: int, daysThreshold: int) -> Dict[str, np.ndarray]:
+        """Hari terlambat, denda dan flag overdue/mendekati jatuh tempo untuk semua loan."""
+        remaining = self.due - today
+        overdue = self.active & (remaining < 0)
+        approaching = self.active & (remaining > 0) & (remaining <= daysThreshold)
+        daysOverdue = np.where(overdue, -remaining, 0)
+        return {
+            "days_overdue": daysOverdue,
+            "fine_amount": daysOverdue * rate,
+            "overdue": overdue,
+            "approaching": approaching,
+        }
+
 
 class PenaltyManager:
-    def __init__(self, loansFile="data/loans.json", penaltiesFile="data/penalties.json", test_mode=False):
+    def __init__(self, loansFile="data/loans.json", penaltiesFile="data/penalties.json", test_mode=False, repository=None):
         self.loansFile = loansFile
         self.penaltiesFile = penaltiesFile
-        self.loans: List[Dict] = []
-        self.penalties: List[Dict] = []
+        # Koleksi dari repository aplikasi (JSON atau SQLite), default file JSON
+        if repository is not None:
+            self.loanStore = repository.collection("loans")
+            self.penaltyStore = repository.collection("penalties")
+        else:
+            self.loanStore = JsonCollection(loansFile, COLLECTIONS["loans"]["key"])
+            self.penaltyStore = JsonCollection(penaltiesFile, COLLECTIONS["penalties"]["key"])
+        self.loans: List[LoanRecord] = []
+        self.penalties: List[PenaltyRecord] = []
+        
+        # Secondary indexes, dijaga tetap sinkron lewat addLoan/addPenalty/updateRecord
+        self.loansByUser = RecordIndex("username")
+        self.loansByIsbnStatus = RecordIndex("isbn", "status")
+        self.loansByIsbnUserStatus = RecordIndex("isbn", "username", "status")
+        self.penaltiesByIsbnStatus = RecordIndex("isbn", "status")
+        self.penaltiesByIsbnUserStatus = RecordIndex("isbn", "username", "status")
+        self.loanIndexes = [self.loansByUser, self.loansByIsbnStatus, self.loansByIsbnUserStatus]
+        self.penaltyIndexes = [self.penaltiesByIsbnStatus, self.penaltiesByIsbnUserStatus]
+        self.indexes = {"loans": self.loanIndexes, "penalties": self.penaltyIndexes}
+        
+        # Record yang berubah/dihapus sejak save terakhir, per koleksi.
+        # Ditulis per record (berdasarkan key) agar perubahan instance lain tidak tertimpa.
+        self.dirty: Dict[str, Dict[int, Record]] = {"loans": {}, "penalties": {}}
+        self.deleted: Dict[str, List[Record]] = {"loans": [], "penalties": []}
+        # Field yang diubah per record, hanya field ini yang ditulis ke store
+        self.changedFields: Dict[str, Dict[int, set]] = {"loans": {}, "penalties": {}}
+        # Nilai GUARD_FIELDS record saat terakhir dibaca/ditulis, dipakai sebagai where
+        self.guards: Dict[str, Dict[int, Dict[str, Any]]] = {"loans": {}, "penalties": {}}
+        
+        # Min-heap (ordinal due date, urutan, loan) untuk loan aktif yang belum dievaluasi overdue
+        self.dueHeap: List[Tuple[int, int, LoanRecord]] = []
+        self.dueSequence = 0
+        self.lastEvaluated = None
+        # Array loan untuk laporan batch, None = perlu dibangun ulang
+        self.loanTable: Optional[LoanTable] = None
+        # Versi koleksi saat terakhir dimuat/disimpan, lihat syncWithStore
+        self.storeRevisions: Tuple[int, int] = (0, 0)
         self.dailyPenaltyRate = 5000  # Rp5000 per day
         self.test_mode = test_mode
         self.test_current_date = None
@@ -46,63 +158,107 @@ class PenaltyManager:
             return self.test_current_date
         return datetime.now().date()
     
-    def atomic_write_json(self, file_path: str, data: Any) -> bool:
-        """Write data to JSON file atomically to prevent corruption."""
-        temp_path = f"{file_path}.tmp"
-        backup_path = f"{file_path}.bak"
-    
-        try:
-            # Write to temp file with lock
-            with open(temp_path, 'w') as f:
-                if os.name == 'posix':  # Unix
-                    import fcntl
-                    fcntl.flock(f, fcntl.LOCK_EX)
-                elif os.name == 'nt':  # Windows
-                    import msvcrt
-                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
-            
-                json.dump(data, f, indent=2)
-            
-                if os.name == 'posix':
-                    fcntl.flock(f, fcntl.LOCK_UN)
-        
-            # Atomic replace
-            if os.path.exists(file_path):
-                os.replace(file_path, backup_path)
-            os.replace(temp_path, file_path)
-        
-            if os.path.exists(backup_path):
-                os.remove(backup_path)
-            return True
-        except Exception as e:
-            if os.path.exists(backup_path):
-                os.replace(backup_path, file_path)
-            raise e
-    
     def loadData(self) -> None:
-        """Load loans and penalties from JSON files with error handling."""
+        """Load loans and penalties from the repository with error handling."""
         try:
-            # Load loans.json
-            if os.path.exists(self.loansFile):
-                with open(self.loansFile, "r") as file:
-                    self.loans = json.load(file)
-            else:
-                self.loans = []
-                self.atomic_write_json(self.loansFile, self.loans)
-            
-            # Load penalties.json
-            if os.path.exists(self.penaltiesFile):
-                with open(self.penaltiesFile, "r") as file:
-                    self.penalties = json.load(file)
-            else:
-                self.penalties = []
-                self.atomic_write_json(self.penaltiesFile, self.penalties)
+            # Load loans
+            self.loanStore.ensure()
+            self.loans = [LoanRecord.from_dict(loan) for loan in self.loanStore.all()]
+            
+            # Load penalties
+            self.penaltyStore.ensure()
+            self.penalties = [PenaltyRecord.from_dict(penalty) for penalty in self.penaltyStore.all()]
+            
+            self.rebuildIndexes()
+            self.dirty = {"loans": {}, "penalties": {}}
+            self.deleted = {"loans": [], "penalties": []}
+            self.changedFields = {"loans": {}, "penalties": {}}
+            self.guards = {
+                "loans": {id(loan): self.guardOf(loan) for loan in self.loans},
+                "penalties": {id(penalty): self.guardOf(penalty) for penalty in self.penalties},
+            }
+            self.storeRevisions = self.currentRevisions()
                     
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON data in files: {str(e)}")
         except Exception as e:
             raise IOError(f"Error loading data: {str(e)}")
     
+    def currentRevisions(self) -> Tuple[int, int]:
+        return self.loanStore.revision(), self.penaltyStore.revision()
+    
+    def syncWithStore(self) -> None:
+        """Reload jika loans/penalties diubah dari luar (frame lain lewat repository yang sama)."""
+        if self.hasChanges() or self.currentRevisions() == self.storeRevisions:
+            return
+        self.loadData()
+    
+    def rebuildIndexes(self) -> None:
+        """Bangun ulang semua index dari self.loans dan self.penalties."""
+        for index in self.loanIndexes:
+            index.rebuild(self.loans)
+        for index in self.penaltyIndexes:
+            index.rebuild(self.penalties)
+        self.loanTable = None
+        self.resetDueTracking()
+    
+    def resetDueTracking(self) -> None:
+        """Rebuild the due-date heap from all active loans."""
+        self.dueHeap = []
+        self.lastEvaluated = None
+        for loan in self.loans:
+            self.pushDue(loan, heapify=False)
+        heapq.heapify(self.dueHeap)
+    
+    def pushDue(self, loan: LoanRecord, heapify: bool = True) -> None:
+        """Track an active loan until it crosses its due date."""
+        if loan.status != "active" or loan.return_date is None:
+            return
+        entry = (loan.return_date, self.dueSequence, loan)
+        self.dueSequence += 1
+        if heapify:
+            heapq.heappush(self.dueHeap, entry)
+        else:
+            self.dueHeap.append(entry)
+    
+    def guardOf(self, record: Record) -> Dict[str, Any]:
+        return {field: record.get(field) for field in GUARD_FIELDS}
+    
+    def markDirty(self, collection: str, record: Record, fields=()) -> None:
+        """Catat record yang harus divalidasi dan disimpan pada saveData berikutnya."""
+        self.dirty[collection][id(record)] = record
+        if fields:
+            self.changedFields[collection].setdefault(id(record), set()).update(fields)
+    
+    def hasChanges(self) -> bool:
+        return any(self.dirty[collection] or self.deleted[collection] for collection in self.dirty)
+    
+    def addLoan(self, loan: LoanRecord) -> None:
+        self.loans.append(loan)
+        for index in self.loanIndexes:
+            index.add(loan)
+        self.pushDue(loan)
+        self.loanTable = None
+        self.markDirty("loans", loan)
+    
+    def addPenalty(self, penalty: PenaltyRecord) -> None:
+        self.penalties.append(penalty)
+        for index in self.penaltyIndexes:
+            index.add(penalty)
+        self.markDirty("penalties", penalty)
+    
+    def updateRecord(self, record: Record, collection: str, **changes) -> None:
+        """Ubah field record dan pindahkan ke bucket index yang sesuai."""
+        affected = [index for index in self.indexes[collection] if any(field in changes for field in index.fields)]
+        for index in affected:
+            index.remove(record)
+        record.update(**changes)
+        for index in affected:
+            index.add(record)
+        if collection == "loans":
+            self.loanTable = None
+        self.markDirty(collection, record, changes)
+    
     def validate_loan_data(self, loan_data: Dict) -> Tuple[bool, str]:
         """Validate loan data before saving."""
         required_fields = ["username", "isbn", "title", "borrow_date", "return_date", "status", "created_at"]
@@ -146,30 +302,66 @@ class PenaltyManager:
         return True, "Data is valid"
 
     def saveData(self) -> bool:
-        """Save loans and penalties to JSON files."""
+        """Save changed loans and penalties to the repository.
+
+        Record baru di-insert, record lama hanya ditulis field yang berubah dan
+        hanya jika status/updated_at di store masih sama dengan saat dibaca.
+        Jika ada yang sudah diubah instance lain, perubahan lokal dibuang dan
+        data dimuat ulang (tidak pernah menimpa perubahan orang lain).
+        """
         try:
-            # Validate loans data
-            for loan in self.loans:
-                isValid, message = self.validate_loan_data(loan)
+            # Manager bisa hidup sepanjang sesi, jangan hitung denda dari data yang sudah basi
+            self.syncWithStore()
+            self.materializePenalties()
+            if not self.hasChanges():
+                return True  # Nothing to persist
+            
+            # Validate changed loans only
+            for loan in self.dirty["loans"].values():
+                isValid, message = self.validate_loan_data(loan.to_dict())
                 if not isValid:
                     print(f"Invalid loan data: {message}")
+                    self.loadData()  # buang perubahan yang tidak valid agar sync tetap jalan
                     return False
 
-            # Validate penalties data
-            for penalty in self.penalties:
-                isValid, message = self.validate_penalty_data(penalty)
+            # Validate changed penalties only
+            for penalty in self.dirty["penalties"].values():
+                isValid, message = self.validate_penalty_data(penalty.to_dict())
                 if not isValid:
                     print(f"Invalid penalty data: {message}")
+                    self.loadData()
                     return False
 
-            # Save loans with proper formatting
-            with open(self.loansFile, "w") as file:
-                json.dump(self.loans, file, indent=2)
-            
-            # Save penalties with proper formatting
-            with open(self.penaltiesFile, "w") as file:
-                json.dump(self.penalties, file, indent=2)
-            
+            # Tidak ada penulisan lain sejak load, cache boleh dianggap sinkron setelah save
+            inSync = self.currentRevisions() == self.storeRevisions
+            conflicts = 0
+            
+            # Save loans, then penalties
+            for collection, store in (("loans", self.loanStore), ("penalties", self.penaltyStore)):
+                guards = self.guards[collection]
+                for record in self.deleted[collection]:
+                    store.delete(record.to_dict(), where=guards.pop(id(record), None))
+                for key, record in self.dirty[collection].items():
+                    data = record.to_dict()
+                    if key not in guards:
+                        saved = store.insert(data, unique=True)
+                    else:
+                        changes = {field: data.get(field) for field in self.changedFields[collection].get(key, ())}
+                        saved = store.patch(data, changes, where=guards[key])
+                    if saved:
+                        guards[key] = self.guardOf(record)
+                    else:
+                        conflicts += 1
+                self.dirty[collection] = {}
+                self.deleted[collection] = []
+                self.changedFields[collection] = {}
+            
+            if conflicts:
+                print(f"{conflicts} record sudah diubah di tempat lain, data dimuat ulang")
+                self.loadData()
+                return False
+            if inSync:
+                self.storeRevisions = self.currentRevisions()
             return True
         except Exception as e:
             print(f"Error saving data: {e}")
@@ -178,12 +370,19 @@ class PenaltyManager:
     def delete_loan(self, loan_id: str) -> Tuple[bool, str]:
         """Delete a loan by its ID."""
         try:
-            original_length = len(self.loans)
-            self.loans = [loan for loan in self.loans if loan.get("id") != loan_id]
+            removed = [loan for loan in self.loans if loan.get("id") == loan_id]
             
-            if len(self.loans) == original_length:
+            if not removed:
                 return False, "Loan not found"
             
+            self.loans = [loan for loan in self.loans if loan.get("id") != loan_id]
+            self.deleted["loans"].extend(removed)
+            
+            for index in self.loanIndexes:
+                index.rebuild(self.loans)
+            self.loanTable = None
+            self.resetDueTracking()
+            
             if self.saveData():
                 return True, "Loan deleted successfully"
             return False, "Error saving data"
@@ -194,12 +393,17 @@ class PenaltyManager:
     def delete_penalty(self, penalty_id: str) -> Tuple[bool, str]:
         """Delete a penalty by its ID."""
         try:
-            original_length = len(self.penalties)
-            self.penalties = [penalty for penalty in self.penalties if penalty.get("id") != penalty_id]
+            removed = [penalty for penalty in self.penalties if penalty.get("id") == penalty_id]
             
-            if len(self.penalties) == original_length:
+            if not removed:
                 return False, "Penalty not found"
             
+            self.penalties = [penalty for penalty in self.penalties if penalty.get("id") != penalty_id]
+            self.deleted["penalties"].extend(removed)
+            
+            for index in self.penaltyIndexes:
+                index.rebuild(self.penalties)
+            
             if self.saveData():
                 return True, "Penalty deleted successfully"
             return False, "Error saving data"
@@ -224,36 +428,33 @@ class PenaltyManager:
             bookId = str(bookId)
             
             # Check if book is already borrowed
-            for loan in self.loans:
-                if str(loan["isbn"]) == bookId and loan["status"] == "active":
-                    return False, "Book is already borrowed"
+            if self.loansByIsbnStatus.first(bookId, "active"):
+                return False, "Book is already borrowed"
             
             # Check if user has unpaid penalties
             if self.getTotalPenalty(userId) > 0:
                 return False, "Cannot borrow books while having unpaid penalties"
             
             # Calculate dates
-            current_date = self.get_current_date()
-            borrow_date = current_date.strftime("%Y-%m-%d")
-            return_date = (current_date + timedelta(days=durationDays)).strftime("%Y-%m-%d")
+            today = self.get_current_date().toordinal()
             
             # Create new loan record
-            newLoan = {
-                "username": userId,
-                "isbn": bookId,
-                "title": "",  # This should be filled by the caller
-                "borrow_date": borrow_date,
-                "return_date": return_date,
-                "status": "active",
-                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
+            newLoan = LoanRecord(
+                username=userId,
+                isbn=bookId,
+                title="",  # This should be filled by the caller
+                borrow_date=today,
+                return_date=today + durationDays,
+                status="active",
+                created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            )
             
             # Validate loan data
-            isValid, message = self.validate_loan_data(newLoan)
+            isValid, message = self.validate_loan_data(newLoan.to_dict())
             if not isValid:
                 return False, message
             
-            self.loans.append(newLoan)
+            self.addLoan(newLoan)
             self.updatePenalties()  # Update penalties after adding new loan
             if self.saveData():
                 return True, "Book borrowed successfully"
@@ -263,58 +464,80 @@ class PenaltyManager:
             return False, f"Error processing loan: {str(e)}"
     
     def updatePenalties(self) -> None:
-        """Update penalties for all overdue books."""
+        """Create penalties for loans that became overdue since the last evaluation."""
         try:
+            self.syncWithStore()
             current_date = self.get_current_date()
-        
-            for loan in self.loans:
-                if loan["status"] == "active":
-                    due_date = datetime.strptime(loan["return_date"], "%Y-%m-%d").date()
-                    if current_date > due_date:
-                        days_overdue = (current_date - due_date).days
-                        penalty_amount = days_overdue * self.dailyPenaltyRate
-                    
-                        # Check if penalty already exists
-                        existing_penalty = next(
-                            (p for p in self.penalties 
-                            if p["isbn"] == loan["isbn"] and 
-                            p["username"] == loan["username"] and 
-                            p["status"] == "active"), 
-                            None
-                        )
-                    
-                        if existing_penalty:
-                            existing_penalty["amount"] = penalty_amount
-                            existing_penalty["days_overdue"] = days_overdue
-                            existing_penalty["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        else:
-                            new_penalty = {
-                                "isbn": loan["isbn"],
-                                "username": loan["username"],
-                                "title": loan["title"],
-                                "amount": penalty_amount,
-                                "days_overdue": days_overdue,
-                                "status": "active",
-                                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                                "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                            }
-                        
-                            # Validate penalty data
-                            is_valid, message = self.validate_penalty_data(new_penalty)
-                            if is_valid:
-                                self.penalties.append(new_penalty)
-        
-            self.saveData()
+            today = current_date.toordinal()
+            created = False
+            
+            # Tanggal mundur (test date / jam sistem), evaluasi ulang dari awal
+            if self.lastEvaluated is not None and current_date < self.lastEvaluated:
+                self.resetDueTracking()
+            
+            # Hanya loan yang melewati due date sejak evaluasi terakhir yang diproses
+            while self.dueHeap and self.dueHeap[0][0] < today:
+                due, _, loan = heapq.heappop(self.dueHeap)
+                if loan.status != "active":
+                    continue
+                
+                # Penalty yang sudah ada dihitung ulang secara lazy (lihat currentPenalty)
+                if self.penaltiesByIsbnUserStatus.first(loan.isbn, loan.username, "active"):
+                    continue
+                
+                days_overdue = today - due
+                new_penalty = PenaltyRecord(
+                    isbn=loan.isbn,
+                    username=loan.username,
+                    title=loan.title,
+                    amount=days_overdue * self.dailyPenaltyRate,
+                    days_overdue=days_overdue,
+                    status="active",
+                    created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    updated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                )
+            
+                # Validate penalty data
+                is_valid, message = self.validate_penalty_data(new_penalty.to_dict())
+                if is_valid:
+                    self.addPenalty(new_penalty)
+                    created = True
+            
+            self.lastEvaluated = current_date
+            if created:
+                self.saveData()
         
         except Exception as e:
             print(f"Error updating penalties: {e}")
     
+    def currentPenalty(self, penalty: PenaltyRecord) -> Tuple[int, int]:
+        """Days overdue and amount of an active penalty, derived from its loan's due date."""
+        loan = self.loansByIsbnUserStatus.first(penalty.isbn, penalty.username, "active")
+        if not loan or loan.return_date is None:
+            return penalty.days_overdue or 0, penalty.amount or 0
+        
+        days_overdue = max(self.get_current_date().toordinal() - loan.return_date, 0)
+        return days_overdue, days_overdue * self.dailyPenaltyRate
+    
+    def materializePenalties(self) -> None:
+        """Write the lazily derived amounts of active penalties into their records."""
+        for penalty in self.penalties:
+            if penalty.status != "active":
+                continue
+            days_overdue, amount = self.currentPenalty(penalty)
+            if penalty.days_overdue != days_overdue or penalty.amount != amount:
+                self.updateRecord(
+                    penalty, "penalties",
+                    days_overdue=days_overdue,
+                    amount=amount,
+                    updated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                )
+    
     def getBorrowedBooks(self, userId: str = "default_user") -> List[Dict]:
         """Get list of books borrowed by a user."""
         try:
             self.updatePenalties()
-            return [loan for loan in self.loans 
-                    if loan["username"] == userId and loan["status"] == "active"]
+            return [loan.to_dict() for loan in self.loansByUser.get(userId) if loan.status == "active"]
         except Exception as e:
             print(f"Error getting borrowed books: {e}")
             return []
@@ -323,21 +546,19 @@ class PenaltyManager:
         """Get list of overdue books for a user."""
         try:
             self.updatePenalties()
-            current_date = self.get_current_date()
+            today = self.get_current_date().toordinal()
             
             overdue_books = []
-            for loan in self.loans:
-                if (loan["username"] == userId and 
-                    loan["status"] == "active"):
+            for loan in self.loansByUser.get(userId):
+                if loan.status == "active" and loan.return_date is not None:
                     
-                    return_date = datetime.strptime(loan["return_date"], "%Y-%m-%d").date()
-                    if current_date > return_date:
+                    if today > loan.return_date:
                         # Calculate days overdue and fine
-                        days_overdue = (current_date - return_date).days
+                        days_overdue = today - loan.return_date
                         fine_amount = days_overdue * self.dailyPenaltyRate
                         
                         # Add fine information to loan record
-                        loan_with_fine = loan.copy()
+                        loan_with_fine = loan.to_dict()
                         loan_with_fine["days_overdue"] = days_overdue
                         loan_with_fine["fine_amount"] = fine_amount
                         
@@ -349,6 +570,57 @@ class PenaltyManager:
             print(f"Error getting overdue books: {e}")
             return []
     
+    def loanArrays(self) -> LoanTable:
+        """Array NumPy semua loan, dibangun ulang hanya jika ada loan yang berubah."""
+        self.syncWithStore()
+        if self.loanTable is None:
+            self.loanTable = LoanTable(self.loans)
+        return self.loanTable
+    
+    def overdue_summary_by_user(self, daysThreshold: int = 2) -> Dict[str, Dict[str, int]]:
+        """Ringkasan overdue semua user dalam satu perhitungan vektor.
+        
+        Returns {username: {overdue_books, days_overdue, total_fine, approaching_due}}
+        untuk user yang punya buku terlambat atau hampir jatuh tempo.
+        """
+        try:
+            table = self.loanArrays()
+            result = table.compute(self.get_current_date().toordinal(), self.dailyPenaltyRate, daysThreshold)
+            size = len(table.users)
+            overdueCodes = table.userCodes[result["overdue"]]
+            overdueBooks = np.bincount(overdueCodes, minlength=size)
+            daysOverdue = np.bincount(overdueCodes, weights=result["days_overdue"][result["overdue"]], minlength=size)
+            approaching = np.bincount(table.userCodes[result["approaching"]], minlength=size)
+            
+            summary = {}
+            for code in np.flatnonzero(overdueBooks + approaching):
+                summary[table.users[code]] = {
+                    "overdue_books": int(overdueBooks[code]),
+                    "days_overdue": int(daysOverdue[code]),
+                    "total_fine": int(daysOverdue[code]) * self.dailyPenaltyRate,
+                    "approaching_due": int(approaching[code]),
+                }
+            return summary
+        except Exception as e:
+            print(f"Error building overdue summary: {e}")
+            return {}
+    
+    def overdue_loans(self) -> List[Dict]:
+        """Semua loan yang terlambat (semua user) beserta hari terlambat dan dendanya."""
+        try:
+            table = self.loanArrays()
+            result = table.compute(self.get_current_date().toordinal(), self.dailyPenaltyRate, 0)
+            overdue_books = []
+            for position in np.flatnonzero(result["overdue"]):
+                loan_with_fine = table.loans[position].to_dict()
+                loan_with_fine["days_overdue"] = int(result["days_overdue"][position])
+                loan_with_fine["fine_amount"] = int(result["fine_amount"][position])
+                overdue_books.append(loan_with_fine)
+            return overdue_books
+        except Exception as e:
+            print(f"Error getting overdue loans: {e}")
+            return []
+    
     def getTotalPenalty(self, userId: str) -> int:
         """Get total penalty amount for a user."""
         try:
@@ -374,17 +646,14 @@ class PenaltyManager:
     def payPenalty(self, bookId: str, userId: str = None) -> Tuple[bool, str]:
         """Pay penalty for a book."""
         try:
+            self.syncWithStore()
             # Find the active loan
-            loan = next(
-                (l for l in self.loans 
-                 if str(l["isbn"]) == str(bookId) and l["status"] == "active"),
-                None
-            )
+            loan = self.loansByIsbnStatus.first(bookId, "active")
             
             if not loan:
                 return False, "No active loan found for this book"
             
-            if userId and loan["username"] != userId:
+            if userId and loan.username != userId:
                 return False, "This loan belongs to another user"
             
             # Calculate the penalty amount
@@ -395,32 +664,34 @@ class PenaltyManager:
             penalty_amount = days_overdue * self.dailyPenaltyRate
             
             # Update or create penalty record
-            penalty = next(
-                (p for p in self.penalties 
-                 if str(p["isbn"]) == str(bookId) and p["status"] == "active"),
-                None
-            )
+            penalty = self.penaltiesByIsbnStatus.first(bookId, "active")
             
             if penalty:
-                penalty["status"] = "paid"
-                penalty["paid_amount"] = penalty_amount
-                penalty["paid_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.updateRecord(
+                    penalty, "penalties",
+                    status="paid",
+                    paid_amount=penalty_amount,
+                    paid_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                )
             else:
-                new_penalty = {
-                    "isbn": bookId,
-                    "username": loan["username"],
-                    "amount": penalty_amount,
-                    "days_overdue": days_overdue,
-                    "status": "paid",
-                    "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "paid_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    "paid_amount": penalty_amount
-                }
-                self.penalties.append(new_penalty)
+                new_penalty = PenaltyRecord(
+                    isbn=bookId,
+                    username=loan.username,
+                    amount=penalty_amount,
+                    days_overdue=days_overdue,
+                    status="paid",
+                    created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    paid_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    paid_amount=penalty_amount
+                )
+                self.addPenalty(new_penalty)
             
             # Update loan status to completed
-            loan["status"] = "completed"
-            loan["actual_return_date"] = datetime.now().strftime("%Y-%m-%d")
+            self.updateRecord(
+                loan, "loans",
+                status="completed",
+                actual_return_date=datetime.now().date().toordinal()
+            )
             
             if self.saveData():
                 return True, "Penalty paid successfully"
@@ -432,35 +703,27 @@ class PenaltyManager:
     def returnBook(self, bookId: str, userId: str = "default_user") -> Tuple[bool, str]:
         """Process book return."""
         try:
+            self.syncWithStore()
             # Find active loan
-            loan = next(
-                (l for l in self.loans 
-                 if str(l["isbn"]) == str(bookId) and 
-                 l["username"] == userId and 
-                 l["status"] == "active"),
-                None
-            )
+            loan = self.loansByIsbnUserStatus.first(bookId, userId, "active")
             
             if not loan:
                 return False, "No active loan found for this book"
             
             # Check for unpaid penalties
-            penalty = next(
-                (p for p in self.penalties 
-                 if str(p["isbn"]) == str(bookId) and 
-                 p["username"] == userId and 
-                 p["status"] == "active"),
-                None
-            )
+            penalty = self.penaltiesByIsbnUserStatus.first(bookId, userId, "active")
             
             if penalty:
                 return False, "Please pay the penalty before returning the book"
             
             # Update loan status
-            currentDate = self.get_current_date()
-            loan["status"] = "completed"
-            loan["actual_return_date"] = currentDate.strftime("%Y-%m-%d")
-            loan["returned_late"] = datetime.strptime(loan["return_date"], "%Y-%m-%d").date() < currentDate
+            today = self.get_current_date().toordinal()
+            self.updateRecord(
+                loan, "loans",
+                status="completed",
+                actual_return_date=today,
+                returned_late=loan.return_date is not None and loan.return_date < today
+            )
             
             self.updatePenalties()  # Update penalties after return
             if self.saveData():
@@ -473,22 +736,18 @@ class PenaltyManager:
     def getDaysRemaining(self, bookId: str) -> int:
         """Get days remaining until due date."""
         try:
-            loan = next(
-                (l for l in self.loans 
-                 if str(l["isbn"]) == str(bookId) and l["status"] == "active"), 
-                None
-            )
+            self.syncWithStore()
+            loan = self.loansByIsbnStatus.first(bookId, "active")
             
-            if not loan:
+            if not loan or loan.return_date is None:
                 return 0
             
-            due_date = datetime.strptime(loan["return_date"], "%Y-%m-%d").date()
-            current_date = self.get_current_date()
+            today = self.get_current_date().toordinal()
             
-            if due_date < current_date:
+            if loan.return_date < today:
                 return 0  # Overdue
             
-            return (due_date - current_date).days
+            return loan.return_date - today
             
         except Exception as e:
             print(f"Error calculating days remaining: {e}")
@@ -497,22 +756,18 @@ class PenaltyManager:
     def getDaysOverdue(self, bookId: str) -> int:
         """Get days overdue for a book."""
         try:
-            loan = next(
-                (l for l in self.loans 
-                 if str(l["isbn"]) == str(bookId) and l["status"] == "active"), 
-                None
-            )
+            self.syncWithStore()
+            loan = self.loansByIsbnStatus.first(bookId, "active")
             
-            if not loan:
+            if not loan or loan.return_date is None:
                 return 0
             
-            due_date = datetime.strptime(loan["return_date"], "%Y-%m-%d").date()
-            current_date = self.get_current_date()
+            today = self.get_current_date().toordinal()
             
-            if current_date <= due_date:
+            if today <= loan.return_date:
                 return 0  # Not overdue
             
-            return (current_date - due_date).days
+            return today - loan.return_date
             
         except Exception as e:
             print(f"Error calculating days overdue: {e}")
@@ -521,13 +776,13 @@ class PenaltyManager:
     def getBooksApproachingDueDate(self, userId: str = "default_user", daysThreshold: int = 2) -> List[Dict]:
         """Get books that are approaching their due date."""
         try:
-            current_date = self.get_current_date()
-            threshold_date = current_date + timedelta(days=daysThreshold)
+            self.syncWithStore()
+            today = self.get_current_date().toordinal()
+            threshold = today + daysThreshold
             
-            return [loan for loan in self.loans 
-                    if loan["username"] == userId 
-                    and loan["status"] == "active"
-                    and current_date < datetime.strptime(loan["return_date"], "%Y-%m-%d").date() <= threshold_date]
+            return [loan.to_dict() for loan in self.loansByUser.get(userId) 
+                    if loan.status == "active"
+                    and loan.return_date is not None and today < loan.return_date <= threshold]
         except Exception as e:
             print(f"Error getting books approaching due date: {e}")
             return []
@@ -535,7 +790,8 @@ class PenaltyManager:
     def getTransactionHistory(self, userId: str = "default_user") -> List[Dict]:
         """Get transaction history for a user."""
         try:
-            return [loan for loan in self.loans if loan["username"] == userId]
+            self.syncWithStore()
+            return [loan.to_dict() for loan in self.loansByUser.get(userId)]
         except Exception as e:
             print(f"Error getting transaction history: {e}")
             return []
\ No newline at end of file
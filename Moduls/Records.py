@@ -0,0 +1,133 @@
+from dataclasses import dataclass, fields
+from datetime import date
+from functools import lru_cache
+from typing import Any, ClassVar, Dict, Optional, Tuple
+
+
+def to_ordinal(value) -> Optional[int]:
+    """'YYYY-MM-DD' -> ordinal hari, None jika kosong atau tidak valid"""
+    if isinstance(value, int):
+        return value
+    try:
+        return date.fromisoformat(value).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+
+def from_ordinal(ordinal: Optional[int]) -> Optional[str]:
+    """Ordinal hari -> 'YYYY-MM-DD'"""
+    return None if ordinal is None else date.fromordinal(ordinal).isoformat()
+
+
+@lru_cache(maxsize=None)
+def _fieldNames(cls) -> Tuple[str, ...]:
+    return tuple(f.name for f in fields(cls) if f.name != "extra")
+
+
+class Record:
+    """Dasar record loan/penalty/booking.
+
+    Tanggal (DATE_FIELDS) disimpan sebagai ordinal sehingga bisa dibandingkan
+    tanpa parsing ulang. Field yang tidak dikenal, atau tanggal yang tidak bisa
+    diparse, dibawa apa adanya di extra agar bentuk JSON tetap sama.
+    Field bernilai None tidak ditulis ke JSON.
+    """
+    __slots__ = ()
+    DATE_FIELDS: ClassVar[Tuple[str, ...]] = ()
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        names = _fieldNames(cls)
+        values = {}
+        extra = None
+        for key, value in data.items():
+            if key in names:
+                if key in cls.DATE_FIELDS and value is not None:
+                    ordinal = to_ordinal(value)
+                    if ordinal is None:
+                        extra = extra or {}
+                        extra[key] = value
+                        continue
+                    value = ordinal
+                values[key] = value
+            else:
+                extra = extra or {}
+                extra[key] = value
+        return cls(**values, extra=extra)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        for name in _fieldNames(type(self)):
+            value = getattr(self, name)
+            if value is None:
+                continue
+            data[name] = from_ordinal(value) if name in self.DATE_FIELDS else value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def update(self, **changes) -> None:
+        """Ubah beberapa field sekaligus, field tidak dikenal masuk extra"""
+        names = _fieldNames(type(self))
+        for key, value in changes.items():
+            if key in names:
+                setattr(self, key, value)
+            else:
+                if self.extra is None:
+                    self.extra = {}
+                self.extra[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Akses seperti dict.get (tanggal dikembalikan sebagai string)"""
+        if key in _fieldNames(type(self)):
+            value = getattr(self, key)
+            if value is None:
+                return default
+            return from_ordinal(value) if key in self.DATE_FIELDS else value
+        return (self.extra or {}).get(key, default)
+
+
+@dataclass(slots=True, eq=False)
+class LoanRecord(Record):
+    DATE_FIELDS: ClassVar[Tuple[str, ...]] = ("borrow_date", "return_date", "actual_return_date")
+
+    username: Optional[str] = None
+    isbn: Any = None
+    title: Optional[str] = None
+    borrow_date: Optional[int] = None
+    return_date: Optional[int] = None        # due date
+    status: Optional[str] = None
+    created_at: Optional[str] = None
+    actual_return_date: Optional[int] = None
+    returned_late: Optional[bool] = None
+    extra: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True, eq=False)
+class PenaltyRecord(Record):
+    isbn: Any = None
+    username: Optional[str] = None
+    title: Optional[str] = None
+    amount: Any = None
+    days_overdue: Any = None
+    status: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    paid_at: Optional[str] = None
+    paid_amount: Any = None
+    extra: Optional[Dict[str, Any]] = None
+
+
+@dataclass(slots=True, eq=False)
+class BookingRecord(Record):
+    DATE_FIELDS: ClassVar[Tuple[str, ...]] = ("booking_date", "return_date")
+
+    username: Optional[str] = None
+    isbn: Any = None
+    title: Optional[str] = None
+    booking_date: Optional[int] = None
+    return_date: Optional[int] = None
+    status: Optional[str] = None
+    created_at: Optional[str] = None
+    canceled_at: Optional[str] = None
+    extra: Optional[Dict[str, Any]] = None
@@ -0,0 +1,547 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Moduls.Book_Store import BookStore, SqliteBookStore
+from Moduls.File_Lock import FileLock
+
+DB_FILENAME = "bookku.db"
+
+# Koleksi data beserta key record dan index yang dipakai query aplikasi
+COLLECTIONS = {
+    "loans": {
+        "file": "loans.json",
+        "key": ("username", "isbn", "created_at"),
+        "indexes": (("username", "status"), ("isbn", "status"), ("return_date",)),
+    },
+    "bookings": {
+        "file": "bookings.json",
+        "key": ("username", "isbn", "created_at"),
+        "indexes": (("username", "status"), ("isbn", "status"), ("booking_date",)),
+    },
+    "penalties": {
+        "file": "penalties.json",
+        "key": ("username", "isbn", "created_at"),
+        "indexes": (("username", "status"), ("isbn", "status")),
+    },
+    "users": {
+        "file": "users.json",
+        "key": ("email",),
+        "indexes": (("role",),),
+        # users.json berbentuk {email: {...}}, bukan list
+        "layout": "dict",
+        "indent": 4,
+    },
+}
+
+
+def _project(value):
+    """Nilai pembanding untuk kolom key/index (ISBN int dan str dianggap sama)"""
+    if value is None:
+        return None
+    return str(value)
+
+
+def _matches(record, criteria):
+    return all(_project(record.get(field)) == _project(value) for field, value in criteria.items())
+
+
+def _merge(record, changes):
+    """Salinan record dengan field dari changes (None = hapus field)"""
+    merged = dict(record)
+    for field, value in changes.items():
+        if value is None:
+            merged.pop(field, None)
+        else:
+            merged[field] = value
+    return merged
+
+
+class JsonCollection:
+    """Koleksi record yang disimpan di satu file JSON (format lama).
+
+    Hasil parse disimpan di memori dan hanya dibaca ulang jika file berubah
+    di disk (mtime/ukuran). Record yang dikembalikan selalu salinan.
+
+    Beberapa instance aplikasi bisa memakai folder data yang sama: setiap
+    penulisan memakai optimistic concurrency. Perubahan dihitung dari snapshot,
+    lalu ditulis di bawah lock file hanya jika counter generasi (file .gen)
+    belum berubah; jika berubah, snapshot dibaca ulang dan perubahan diulang.
+    Setelah MAX_RETRIES konflik, perubahan dihitung sambil memegang lock.
+    """
+    MAX_RETRIES = 5
+
+    def __init__(self, path, key, layout="list", indent=2, indexes=()):
+        self.path = path
+        self.key = tuple(key)
+        self.layout = layout
+        self.indent = indent
+        self.indexes = tuple(tuple(index) for index in indexes)
+        self.version = 0          # naik setiap isi koleksi berubah
+        self.lock_path = f"{path}.lock"
+        self.generation_path = f"{path}.gen"
+        self._lock = threading.RLock()
+        self._cache = None
+        self._signature = None
+        self._generation = None   # generasi file saat cache dibaca
+        self._tables = {}         # index -> {nilai key: [record]}
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, "r") as f:
+            data = json.load(f)
+
+        if self.layout == "dict":
+            field = self.key[0]
+            return [{field: name, **record} for name, record in data.items()]
+        # File kosong dibuat sebagai {} oleh create_empty_json_files
+        return data if isinstance(data, list) else []
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def generation(self):
+        """Counter generasi di file .gen, naik setiap kali koleksi ditulis"""
+        try:
+            with open(self.generation_path, "r") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _records(self, generation=None):
+        """Record di memori, diparse ulang jika file (atau generasinya) berubah"""
+        signature = self._stat()
+        stale = generation is not None and generation != self._generation
+        if self._cache is None or signature != self._signature or stale:
+            self._generation = self.generation() if generation is None else generation
+            self._cache = self._read()
+            self._signature = signature
+            self._tables = {}
+            self.version += 1
+        return self._cache
+
+    def _candidates(self, criteria):
+        """Record yang mungkin cocok, lewat index jika ada yang sesuai criteria"""
+        records = self._records()
+        for index in self.indexes:
+            if all(field in criteria for field in index):
+                table = self._tables.get(index)
+                if table is None:
+                    table = self._tables[index] = {}
+                    for record in records:
+                        table.setdefault(tuple(_project(record.get(field)) for field in index), []).append(record)
+                return table.get(tuple(_project(criteria[field]) for field in index), [])
+        return records
+
+    def _write(self, records, generation):
+        """Tulis file data lalu naikkan generasi (harus di bawah lock file)"""
+        # Cache dianggap tidak valid sampai file benar-benar tertulis
+        self._cache = None
+        if self.layout == "dict":
+            field = self.key[0]
+            data = {record[field]: {k: v for k, v in record.items() if k != field} for record in records}
+        else:
+            data = records
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f, indent=self.indent)
+        os.replace(temp_path, self.path)
+
+        temp_path = f"{self.generation_path}.tmp"
+        with open(temp_path, "w") as f:
+            f.write(str(generation + 1))
+        os.replace(temp_path, self.generation_path)
+
+        self._cache = records
+        self._signature = self._stat()
+        self._generation = generation + 1
+        self._tables = {}
+        self.version += 1
+
+    def _commit(self, change):
+        """Read-modify-write dengan retry.
+
+        change(records) menerima snapshot dan mengembalikan (records baru, hasil);
+        records baru None berarti tidak ada yang perlu ditulis.
+        """
+        with self._lock:
+            for _ in range(self.MAX_RETRIES):
+                generation = self.generation()
+                records, result = change(self._records(generation))
+                if records is None:
+                    return result
+                with FileLock(self.lock_path):
+                    if self.generation() != generation:
+                        continue  # ditulis proses lain, ulangi dari snapshot baru
+                    self._write(records, generation)
+                    return result
+
+            # Terlalu sering konflik, hitung ulang sambil memegang lock
+            with FileLock(self.lock_path):
+                generation = self.generation()
+                records, result = change(self._records(generation))
+                if records is not None:
+                    self._write(records, generation)
+                return result
+
+    def _keyOf(self, record):
+        return tuple(_project(record.get(field)) for field in self.key)
+
+    def ensure(self):
+        """Buat file kosong jika belum ada"""
+        if not os.path.exists(self.path):
+            self._commit(lambda records: ([] if not os.path.exists(self.path) else None, None))
+
+    def revision(self):
+        """Versi koleksi saat ini (memeriksa perubahan file di disk)"""
+        with self._lock:
+            self._records()
+            return self.version
+
+    def all(self):
+        with self._lock:
+            return [dict(record) for record in self._records()]
+
+    def find(self, **criteria):
+        with self._lock:
+            return [dict(record) for record in self._candidates(criteria) if _matches(record, criteria)]
+
+    def find_one(self, **criteria):
+        return next(iter(self.find(**criteria)), None)
+
+    def insert(self, record, unique=False):
+        """Tambahkan record. Dengan unique=True, False jika key sudah ada."""
+        def change(records):
+            if unique and any(self._keyOf(existing) == self._keyOf(record) for existing in records):
+                return None, False
+            return records + [dict(record)], True
+        return self._commit(change)
+
+    def update(self, record, where=None):
+        """Ganti record dengan key yang sama. False jika tidak ditemukan.
+
+        where: kondisi tambahan pada record yang tersimpan, misalnya
+        {"status": "active"} agar perubahan dari proses lain tidak ditimpa.
+        """
+        key = self._keyOf(record)
+
+        def change(records):
+            updated = [
+                dict(record) if self._keyOf(existing) == key and _matches(existing, where or {}) else existing
+                for existing in records
+            ]
+            found = any(new is not old for new, old in zip(updated, records))
+            return (updated if found else None), found
+        return self._commit(change)
+
+    def patch(self, record, changes, where=None):
+        """Ubah sebagian field record tersimpan dengan key yang sama. False jika tidak ditemukan.
+
+        Hanya field di changes yang ditulis (None menghapus field), field lain
+        tetap seperti di disk. where seperti pada update().
+        """
+        key = self._keyOf(record)
+
+        def change(records):
+            updated = [
+                _merge(existing, changes) if self._keyOf(existing) == key and _matches(existing, where or {}) else existing
+                for existing in records
+            ]
+            found = any(new is not old for new, old in zip(updated, records))
+            return (updated if found else None), found
+        return self._commit(change)
+
+    def upsert(self, records):
+        """Update record yang sudah ada (berdasarkan key), tambahkan yang baru. Satu kali tulis."""
+        def change(existing):
+            existing = list(existing)
+            positions = {self._keyOf(record): i for i, record in enumerate(existing)}
+            for record in records:
+                position = positions.get(self._keyOf(record))
+                if position is None:
+                    positions[self._keyOf(record)] = len(existing)
+                    existing.append(dict(record))
+                else:
+                    existing[position] = dict(record)
+            return existing, None
+        records = list(records)
+        self._commit(change)
+
+    def delete(self, record, where=None):
+        key = self._keyOf(record)
+
+        def change(records):
+            remaining = [
+                existing for existing in records
+                if self._keyOf(existing) != key or not _matches(existing, where or {})
+            ]
+            if len(remaining) == len(records):
+                return None, False
+            return remaining, True
+        return self._commit(change)
+
+    def replace_all(self, records):
+        records = [dict(record) for record in records]
+        self._commit(lambda existing: (records, None))
+
+
+class SqliteDatabase:
+    """Koneksi SQLite bersama (mode WAL) untuk semua koleksi"""
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+
+    def execute(self, sql, params=()):
+        with self.lock:
+            return self.connection.execute(sql, params)
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class SqliteCollection:
+    """Koleksi record di tabel SQLite.
+
+    Record utuh disimpan sebagai JSON di kolom data, field key dan index
+    diproyeksikan ke kolom sendiri agar bisa di-query lewat index.
+    """
+    def __init__(self, database, name, key, indexes=()):
+        self.database = database
+        self.name = name
+        self.key = tuple(key)
+        self.indexes = tuple(tuple(index) for index in indexes)
+        self.columns = list(dict.fromkeys(self.key + tuple(field for index in self.indexes for field in index)))
+        self.ensure()
+
+    def ensure(self):
+        columns = ", ".join(f'"{column}" TEXT' for column in self.columns)
+        self.database.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self.name}" (id INTEGER PRIMARY KEY AUTOINCREMENT, {columns}, data TEXT NOT NULL)'
+        )
+        for index in (self.key,) + self.indexes:
+            index_name = f"idx_{self.name}_{'_'.join(index)}"
+            fields = ", ".join(f'"{field}"' for field in index)
+            self.database.execute(f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{self.name}" ({fields})')
+        self.database.execute('CREATE TABLE IF NOT EXISTS collection_versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)')
+
+    def revision(self):
+        """Versi koleksi di database, naik pada setiap penulisan dari koneksi/proses mana pun"""
+        row = self.database.execute('SELECT version FROM collection_versions WHERE name = ?', (self.name,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump(self, connection):
+        """Naikkan versi koleksi, dipanggil di dalam transaksi penulisan"""
+        connection.execute(
+            'INSERT INTO collection_versions (name, version) VALUES (?, 1) '
+            'ON CONFLICT(name) DO UPDATE SET version = version + 1', (self.name,)
+        )
+
+    def _row(self, record):
+        return [_project(record.get(column)) for column in self.columns] + [json.dumps(record)]
+
+    def _where(self, criteria, fields):
+        clause = " AND ".join(f'"{field}" IS ?' for field in fields)
+        return clause or "1", [_project(criteria[field]) for field in fields]
+
+    def all(self):
+        rows = self.database.execute(f'SELECT data FROM "{self.name}" ORDER BY id').fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def find(self, **criteria):
+        indexed = [field for field in criteria if field in self.columns]
+        clause, params = self._where(criteria, indexed)
+        rows = self.database.execute(
+            f'SELECT data FROM "{self.name}" WHERE {clause} ORDER BY id', params
+        ).fetchall()
+        records = [json.loads(row[0]) for row in rows]
+
+        # Field yang tidak diproyeksikan difilter setelah query
+        rest = {field: value for field, value in criteria.items() if field not in indexed}
+        return [record for record in records if _matches(record, rest)] if rest else records
+
+    def find_one(self, **criteria):
+        return next(iter(self.find(**criteria)), None)
+
+    def insert(self, record, unique=False):
+        """Tambahkan record. Dengan unique=True, False jika key sudah ada."""
+        placeholders = ", ".join("?" for _ in range(len(self.columns) + 1))
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        with self.database.transaction() as connection:
+            if unique:
+                clause, params = self._where(record, self.key)
+                if connection.execute(f'SELECT 1 FROM "{self.name}" WHERE {clause}', params).fetchone():
+                    return False
+            connection.execute(
+                f'INSERT INTO "{self.name}" ({columns}, data) VALUES ({placeholders})', self._row(record)
+            )
+            self._bump(connection)
+        return True
+
+    def update(self, record, where=None):
+        """Ganti record dengan key yang sama. False jika tidak ditemukan.
+
+        where: kondisi tambahan pada record yang tersimpan (lihat JsonCollection.update).
+        """
+        clause, params = self._where(record, self.key)
+        assignments = ", ".join(f'"{column}" = ?' for column in self.columns)
+        with self.database.transaction() as connection:
+            rows = connection.execute(f'SELECT id, data FROM "{self.name}" WHERE {clause}', params).fetchall()
+            ids = [row[0] for row in rows if _matches(json.loads(row[1]), where or {})]
+            for row_id in ids:
+                connection.execute(
+                    f'UPDATE "{self.name}" SET {assignments}, data = ? WHERE id = ?', self._row(record) + [row_id]
+                )
+            if ids:
+                self._bump(connection)
+        return bool(ids)
+
+    def patch(self, record, changes, where=None):
+        """Ubah sebagian field record tersimpan (lihat JsonCollection.patch)."""
+        clause, params = self._where(record, self.key)
+        assignments = ", ".join(f'"{column}" = ?' for column in self.columns)
+        with self.database.transaction() as connection:
+            rows = connection.execute(f'SELECT id, data FROM "{self.name}" WHERE {clause}', params).fetchall()
+            matched = [(row[0], json.loads(row[1])) for row in rows]
+            matched = [(row_id, data) for row_id, data in matched if _matches(data, where or {})]
+            for row_id, data in matched:
+                connection.execute(
+                    f'UPDATE "{self.name}" SET {assignments}, data = ? WHERE id = ?',
+                    self._row(_merge(data, changes)) + [row_id]
+                )
+            if matched:
+                self._bump(connection)
+        return bool(matched)
+
+    def upsert(self, records):
+        """Update record yang sudah ada (berdasarkan key), tambahkan yang baru. Satu transaksi."""
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        placeholders = ", ".join("?" for _ in range(len(self.columns) + 1))
+        assignments = ", ".join(f'"{column}" = ?' for column in self.columns)
+        with self.database.transaction() as connection:
+            for record in records:
+                clause, params = self._where(record, self.key)
+                row = self._row(record)
+                cursor = connection.execute(
+                    f'UPDATE "{self.name}" SET {assignments}, data = ? WHERE {clause}', row + params
+                )
+                if cursor.rowcount == 0:
+                    connection.execute(
+                        f'INSERT INTO "{self.name}" ({columns}, data) VALUES ({placeholders})', row
+                    )
+            self._bump(connection)
+
+    def delete(self, record, where=None):
+        clause, params = self._where(record, self.key)
+        with self.database.transaction() as connection:
+            rows = connection.execute(f'SELECT id, data FROM "{self.name}" WHERE {clause}', params).fetchall()
+            ids = [row[0] for row in rows if _matches(json.loads(row[1]), where or {})]
+            for row_id in ids:
+                connection.execute(f'DELETE FROM "{self.name}" WHERE id = ?', (row_id,))
+            if ids:
+                self._bump(connection)
+        return bool(ids)
+
+    def replace_all(self, records):
+        placeholders = ", ".join("?" for _ in range(len(self.columns) + 1))
+        columns = ", ".join(f'"{column}"' for column in self.columns)
+        with self.database.transaction() as connection:
+            connection.execute(f'DELETE FROM "{self.name}"')
+            connection.executemany(
+                f'INSERT INTO "{self.name}" ({columns}, data) VALUES ({placeholders})',
+                [self._row(record) for record in records]
+            )
+            self._bump(connection)
+
+
+class Repository:
+    """Titik akses penyimpanan data aplikasi.
+
+    Memakai SQLite jika data/bookku.db ada (lihat migrate()), jika tidak
+    tetap memakai file JSON/XLSX lama. Semua koleksi punya API yang sama.
+    Satu instance dimiliki Application dan dipakai bersama semua frame,
+    sehingga setiap koleksi hanya punya satu cache dan satu lock penulisan.
+    """
+    def __init__(self, data_dir, backend=None, db_path=None):
+        self.data_dir = data_dir
+        self.db_path = db_path or os.path.join(data_dir, DB_FILENAME)
+        self.backend = backend or ("sqlite" if os.path.exists(self.db_path) else "json")
+        self.database = SqliteDatabase(self.db_path) if self.backend == "sqlite" else None
+        self._collections = {}
+
+    def collection(self, name):
+        """Koleksi loans/bookings/penalties/users"""
+        if name not in self._collections:
+            config = COLLECTIONS[name]
+            if self.database is not None:
+                collection = SqliteCollection(self.database, name, config["key"], config["indexes"])
+            else:
+                collection = JsonCollection(
+                    os.path.join(self.data_dir, config["file"]), config["key"],
+                    config.get("layout", "list"), config.get("indent", 2), config["indexes"]
+                )
+            self._collections[name] = collection
+        return self._collections[name]
+
+    def book_store(self, excel_path):
+        """Store katalog buku sesuai backend"""
+        if self.database is not None:
+            return SqliteBookStore(self.database, excel_path)
+        return BookStore(excel_path)
+
+    def close(self):
+        if self.database is not None:
+            self.database.close()
+
+
+def migrate(data_dir, db_path=None, excel_path=None):
+    """Pindahkan data JSON/XLSX ke database SQLite"""
+    db_path = db_path or os.path.join(data_dir, DB_FILENAME)
+    excel_path = excel_path or os.path.join(data_dir, "data_buku_2.xlsx")
+
+    source = Repository(data_dir, backend="json")
+    target = Repository(data_dir, backend="sqlite", db_path=db_path)
+    try:
+        for name in COLLECTIONS:
+            records = source.collection(name).all()
+            target.collection(name).replace_all(records)
+            print(f"{name}: {len(records)} record")
+
+        # Katalog diambil dari store lama (termasuk journal) agar perubahan terakhir ikut
+        book = source.book_store(excel_path).load()
+        target.book_store(excel_path).import_frame(book)
+        print(f"books: {len(book)} record")
+    finally:
+        target.close()
+    return db_path
+
+
+if __name__ == '__main__':
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(base_dir, "data")
+    print(f"Database dibuat: {migrate(data_dir)}")
@@ -0,0 +1,167 @@
+import re
+import bisect
+import unicodedata
+
+# Kolom yang diindex beserta bobotnya untuk ranking
+SEARCH_FIELDS = {
+    'Judul': 3.0,
+    'ISBN': 3.0,
+    'Penulis': 2.0,
+    'Kategori': 1.5,
+    'Penerbit': 1.0,
+    'Deskripsi': 0.5,
+}
+
+# Bobot jenis kecocokan token query terhadap token di index
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.6
+SUBSTRING_MATCH = 0.3
+
+TOKEN_PATTERN = re.compile(r"\w+")
+COMBINING_PATTERN = re.compile(r"[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]")
+
+
+def fold(text):
+    """Normalisasi teks: huruf kecil dan tanpa diakritik (é -> e)"""
+    text = str(text)
+    if text.isascii():
+        return text.casefold()
+    text = COMBINING_PATTERN.sub("", unicodedata.normalize("NFKD", text))
+    return text.casefold()
+
+
+def tokenize(text):
+    """Pecah teks menjadi token yang sudah dinormalisasi"""
+    if text is None:
+        return []
+    return TOKEN_PATTERN.findall(fold(text))
+
+
+class SearchIndex:
+    """Inverted index untuk pencarian katalog.
+
+    Mendukung pencocokan token utuh, prefix (via daftar token terurut) dan
+    substring (via index n-gram token). Hasil diurutkan berdasarkan skor.
+    """
+    def __init__(self, fields=None, ngram_size=3):
+        self.fields = fields or SEARCH_FIELDS
+        self.ngram_size = ngram_size
+        self.postings = {}      # token -> {doc: skor}
+        self.docTokens = {}     # doc -> set(token), untuk hapus/update
+        self.ngrams = {}        # n-gram -> set(token)
+        self.vocabulary = []    # token terurut untuk pencarian prefix
+        self.vocabularyDirty = False
+        self.built = False
+
+    def build(self, books, key='ISBN'):
+        """Bangun index dari seluruh DataFrame buku"""
+        self.postings = {}
+        self.docTokens = {}
+        self.ngrams = {}
+        columns = [column for column in self.fields if column in books.columns]
+        for record in books[columns + ([key] if key not in columns else [])].to_dict('records'):
+            self.add(record[key], record)
+        self.built = True
+
+    def _gramsOf(self, token):
+        size = self.ngram_size
+        return {token[i:i + size] for i in range(len(token) - size + 1)}
+
+    def add(self, doc, record):
+        """Tambahkan satu buku ke index"""
+        doc = str(doc)
+        if doc in self.docTokens:
+            self.remove(doc)
+
+        scores = {}
+        for column, weight in self.fields.items():
+            value = record.get(column)
+            if value is None or value != value:  # None atau NaN
+                continue
+            for token in set(tokenize(value)):
+                scores[token] = scores.get(token, 0) + weight
+
+        for token, score in scores.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                for gram in self._gramsOf(token):
+                    self.ngrams.setdefault(gram, set()).add(token)
+                self.vocabularyDirty = True
+            posting[doc] = score
+        self.docTokens[doc] = set(scores)
+
+    def update(self, doc, record):
+        """Perbarui data satu buku di index"""
+        self.add(doc, record)
+
+    def remove(self, doc):
+        """Hapus satu buku dari index"""
+        doc = str(doc)
+        for token in self.docTokens.pop(doc, ()):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            posting.pop(doc, None)
+            if not posting:
+                del self.postings[token]
+                for gram in self._gramsOf(token):
+                    tokens = self.ngrams.get(gram)
+                    if tokens is not None:
+                        tokens.discard(token)
+                        if not tokens:
+                            del self.ngrams[gram]
+                self.vocabularyDirty = True
+
+    def _matchingTokens(self, term):
+        """Token di index yang cocok dengan term beserta bobot kecocokannya"""
+        matches = {}
+
+        # Prefix, termasuk token yang sama persis
+        if self.vocabularyDirty:
+            self.vocabulary = sorted(self.postings)
+            self.vocabularyDirty = False
+        start = bisect.bisect_left(self.vocabulary, term)
+        for token in self.vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            matches[token] = EXACT_MATCH if token == term else PREFIX_MATCH
+
+        # Substring di tengah token via n-gram
+        if len(term) >= self.ngram_size:
+            candidates = None
+            for gram in self._gramsOf(term):
+                tokens = self.ngrams.get(gram)
+                if not tokens:
+                    candidates = set()
+                    break
+                candidates = set(tokens) if candidates is None else candidates & tokens
+            for token in candidates or ():
+                if token not in matches and term in token:
+                    matches[token] = SUBSTRING_MATCH
+
+        return matches
+
+    def search(self, query):
+        """Cari buku, semua term harus cocok. Mengembalikan [(doc, skor)] terurut."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        results = None
+        for term in dict.fromkeys(terms):
+            termScores = {}
+            for token, matchWeight in self._matchingTokens(term).items():
+                for doc, score in self.postings[token].items():
+                    weighted = score * matchWeight
+                    if weighted > termScores.get(doc, 0):
+                        termScores[doc] = weighted
+
+            if results is None:
+                results = termScores
+            else:
+                results = {doc: results[doc] + score for doc, score in termScores.items() if doc in results}
+            if not results:
+                return []
+
+        return sorted(results.items(), key=lambda item: item[1], reverse=True)
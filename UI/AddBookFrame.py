@@ -417,6 +417,10 @@ class AddBookFrame(ctk.CTkFrame):
             else:
                 # Use default cover
                 shutil.copy(self.default_cover, cover_path)
+
+            # Thumbnail lama untuk ISBN ini tidak berlaku lagi
+            if hasattr(self.controller, "invalidateCover"):
+                self.controller.invalidateCover(isbn)
                 
         except Exception as e:
             messagebox.showerror("Error", f"Gagal menyimpan gambar cover: {e}")
@@ -2,10 +2,14 @@ import tkinter as tk
 import customtkinter as ctk
 from tkinter import messagebox
 from PIL import Image
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import os
-import json
+import sys
 import calendar
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Moduls.Repository import Repository
+from Moduls.Records import BookingRecord
 
 class BorrowPopUp(ctk.CTkToplevel):
     def __init__(self, parent, controller, book, is_booking=False):
@@ -39,14 +43,13 @@ class BorrowPopUp(ctk.CTkToplevel):
         
         # Data dir for booking records
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
-        self.bookings_file = os.path.join(self.data_dir, "bookings.json")
-        self.loans_file = os.path.join(self.data_dir, "loans.json")
+        repository = getattr(self.controller, 'repository', None) or Repository(self.data_dir)
+        self.bookings_store = repository.collection("bookings")
+        self.loans_store = repository.collection("loans")
         
-        # Create files if they don't exist
-        for file_path in [self.bookings_file, self.loans_file]:
-            if not os.path.exists(file_path):
-                with open(file_path, 'w') as f:
-                    json.dump([], f)
+        # Create storage if it doesn't exist
+        for store in [self.bookings_store, self.loans_store]:
+            store.ensure()
         
         # Set dates
         self.today = datetime.now().date()
@@ -543,21 +546,15 @@ class BorrowPopUp(ctk.CTkToplevel):
             print(f"Error in confirm_action: {e}")
     
     def add_booking_record(self, user):
-        """Add a booking record to bookings.json"""
+        """Add a booking record"""
         booking_date = self.selected_booking_date.strftime("%Y-%m-%d")
         return_date = self.return_date.strftime("%Y-%m-%d")
         
-        try:
-            with open(self.bookings_file, 'r') as f:
-                bookings = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            bookings = []
-        
         # Extract username from user dictionary
         username = user.get("username", "")
         
         # Add new booking
-        bookings.append({
+        self.bookings_store.insert({
             "username": username,
             "isbn": self.book.get('ISBN', ''),
             "title": self.book.get('Judul', 'Unknown Title'),
@@ -566,24 +563,14 @@ class BorrowPopUp(ctk.CTkToplevel):
             "status": "active",
             "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         })
-        
-        with open(self.bookings_file, 'w') as f:
-            json.dump(bookings, f, indent=2)
     
     def add_loan_record(self, username):
-        """Add a loan record to loans.json"""
+        """Add a loan record"""
         borrow_date = self.today.strftime("%Y-%m-%d")
         return_date = self.return_date.strftime("%Y-%m-%d")
         
-        try:
-            with open(self.loans_file, 'r') as f:
-                loans = json.load(f)
-        except KeyError as e:
-            print(f"KeyError occurred: {e}")
-            loans = []
-        
         # Add new loan dengan format username yang benar
-        loans.append({
+        self.loans_store.insert({
             "username": username["username"],  # Menggunakan username dari dictionary
             "isbn": self.book.get('ISBN', ''),
             "title": self.book.get('Judul', 'Unknown Title'),
@@ -592,9 +579,6 @@ class BorrowPopUp(ctk.CTkToplevel):
             "status": "active",
             "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         })
-        
-        with open(self.loans_file, 'w') as f:
-            json.dump(loans, f, indent=2)
     
     def find_first_available_date(self):
         """Find the first available date for booking"""
@@ -621,25 +605,16 @@ class BorrowPopUp(ctk.CTkToplevel):
         
         # Load existing bookings
         try:
-            with open(self.bookings_file, 'r') as f:
-                bookings = json.load(f)
-                
-            # Filter bookings for this book
-            book_bookings = [
-                b for b in bookings 
-                if b.get('isbn', '') == self.book.get('ISBN', '') and b.get('status', '') == 'active'
-            ]
+            # Active bookings for this book (indexed query)
+            book_bookings = self.bookings_store.find(isbn=self.book.get('ISBN', ''), status='active')
             
             # Extract booked dates
-            for booking in book_bookings:
-                booking_date = datetime.strptime(booking.get('booking_date', ''), "%Y-%m-%d").date()
-                return_date = datetime.strptime(booking.get('return_date', ''), "%Y-%m-%d").date()
+            for booking in map(BookingRecord.from_dict, book_bookings):
+                if booking.booking_date is None or booking.return_date is None:
+                    continue
                 
                 # Add all dates between booking_date and return_date (inclusive)
-                current_date = booking_date
-                while current_date <= return_date:
-                    booked_dates.append(current_date)
-                    current_date += timedelta(days=1)
+                booked_dates.extend(date.fromordinal(day) for day in range(booking.booking_date, booking.return_date + 1))
                 
         except Exception as e:
             print(f"Error loading bookings: {e}")
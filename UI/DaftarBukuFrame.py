@@ -6,29 +6,28 @@ import os
 import sys
 import math
 import pandas as pd
+from collections import OrderedDict
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 # Import Category_Mapping untuk genre
-from constans import CATEGORY_MAPPING
+from constans import CATEGORY_MAPPING, GENRE_TO_CATEGORY
 
 # Import Tema //Dark or //Light
 from constans import COLOR_DARK, COLOR_LIGHT
 
+from Moduls.Cover_Cache import CoverLoader
+
 
 # Mendefinisikan category yang ada pada CATEGORY_MAPPING untuk fungsi filter
 def categorize_genre(genre):
-    for category, keywords in CATEGORY_MAPPING.items():
-        if genre in keywords:
-            return category
-    return "Other"
-
-# Sistem load genre dari file data buku
-def load_genre_data():
-    file_path = "data/data_buku_2.xlsx"  # Menggunakan file data_buku_2.xlsx
-    df = pd.read_excel(file_path)
-    if "Kategori" in df.columns:
-        df["Category"] = df["Kategori"].apply(categorize_genre)
+    return GENRE_TO_CATEGORY.get(genre, "Other")
+
+# Sistem load genre dari data buku yang sudah dimuat BookManager
+def load_genre_data(df):
+    if df is not None and "Category" in df.columns:
         return df["Category"].unique().tolist()
+    if df is not None and "Kategori" in df.columns:
+        return df["Kategori"].map(categorize_genre).unique().tolist()
     return []
 
 
@@ -43,6 +42,8 @@ class Tooltip:
 
     # Menampilkan tooltip
     def show_tooltip(self, event=None):
+        if not self.text:
+            return
         x, y, _, _ = self.widget.bbox("insert")
         x += self.widget.winfo_rootx() + 25
         y += self.widget.winfo_rooty() + 25
@@ -72,7 +73,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 class DataBookFrame(ctk.CTkFrame):
     def __init__(self, parent, controller):
         ctk.CTkFrame.__init__(self, parent)
-        self.genre_options = load_genre_data()
+        self.genre_options = load_genre_data(controller.getBook())
         self.is_dark_mode = True
         self.color = COLOR_DARK if self.is_dark_mode else COLOR_LIGHT
 
@@ -90,6 +91,27 @@ class DataBookFrame(ctk.CTkFrame):
         self.current_page = 1
         self.total_pages = 1
 
+        # Cover di-decode di background, kartu tampil dulu dengan placeholder
+        self.cover_size = (100, 150)
+        self.cover_loader = CoverLoader(self, self.MyLibrary.decodeCover)
+        placeholder = Image.new('RGB', self.cover_size, color='lightgray')
+        self.cover_placeholder = ctk.CTkImage(light_image=placeholder, dark_image=placeholder, size=self.cover_size)
+
+        # Kartu buku dipakai ulang antar halaman
+        self.card_pool = []
+        self.no_books_label = None
+
+        # Prefetch halaman di sekitar halaman aktif saat idle
+        self.prefetch_depth = 1
+        self.prefetch_job = None
+        self.page_source = None      # hasil filter yang sedang ditampilkan
+        self.page_source_version = None
+        self.prefetched_pages = {}   # nomor halaman -> potongan DataFrame
+
+        # Cache posisi hasil filter per (query, genre, status, versi katalog)
+        self.filter_cache = OrderedDict()
+        self.filter_cache_size = 16
+
         # Config untuk Isi window utama
         self.columnconfigure(0, weight=1)
         self.rowconfigure(0, weight=0)  # Header
@@ -108,6 +130,18 @@ class DataBookFrame(ctk.CTkFrame):
 
         # Populate grid with books
         self.populate_book_grid()
+
+        # Siapkan index pencarian di background setelah tampilan pertama selesai
+        if hasattr(self.MyLibrary, "warmSearchIndex"):
+            self.after(1000, self.MyLibrary.warmSearchIndex)
+
+    def destroy(self):
+        """Hentikan decode cover yang masih antre sebelum frame (atau aplikasi) ditutup"""
+        if self.prefetch_job is not None:
+            self.after_cancel(self.prefetch_job)
+            self.prefetch_job = None
+        self.cover_loader.shutdown()
+        super().destroy()
         
 
     # =============================== WIDGET FACTORY FUNCTIONS ===============================
@@ -487,8 +521,8 @@ class DataBookFrame(ctk.CTkFrame):
     # ===================================================================================
 
     # Create book card
-    def create_book_card(self, book):
-        """Membuat kartu buku individual"""
+    def create_book_card(self):
+        """Membuat kartu buku kosong, isinya diisi lewat bind_book_card"""
         # Membuat frame buku
         book_frame = self.create_frame(
             self.book_grid,
@@ -504,73 +538,107 @@ class DataBookFrame(ctk.CTkFrame):
         book_frame.rowconfigure(2, weight=0)  # Author
         book_frame.rowconfigure(3, weight=0)  # Status
 
-        # Load book cover
-        img = self.MyLibrary.LoadCover(book.get('ISBN', ''))
-
         # Book cover button
-        btn = ctk.CTkButton(
+        book_frame.cover_btn = ctk.CTkButton(
             book_frame,
-            image=img,
+            image=self.cover_placeholder,
             text="",
             fg_color="transparent",
             hover_color=self.color["active"]["button"],
-            border_width=0,
-            command=lambda b=book: self.controller.showBookDetail(b)
+            border_width=0
         )
-        btn.image = img  # Keep reference
-        btn.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+        book_frame.cover_btn.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
 
-        # Book title (truncate if too long)
-        title = book.get('Judul', 'Judul Tidak Ada')
-        title_truncated = self.truncate_text(title, 20)
-
-        title_label = self.create_label(
+        # Book title
+        book_frame.title_label = self.create_label(
             book_frame,
-            text=title_truncated,
+            text="",
             font_size=14,
             font_weight="bold",
             wraplength=120,
             anchor="center"
         )
-        title_label.grid(row=1, column=0, padx=5, pady=5, sticky="ew")
+        book_frame.title_label.grid(row=1, column=0, padx=5, pady=5, sticky="ew")
+        book_frame.title_tooltip = self.create_tooltip(book_frame.title_label, None)
 
-        # Add tooltip for truncated titles
-        if title_truncated != title:
-            self.create_tooltip(title_label, title)
+        # Author
+        book_frame.author_label = self.create_label(
+            book_frame,
+            text="",
+            text_color=self.color["primaryText"],
+            font_size=12,
+            wraplength=120,
+            anchor="center"
+        )
+        book_frame.author_tooltip = self.create_tooltip(book_frame.author_label, None)
+
+        # Status label
+        book_frame.status_label = self.create_label(
+            book_frame,
+            text="",
+            font_size=12,
+            font_weight="bold"
+        )
+
+        book_frame.isbn = None
+        return book_frame
+
+    # Bind data buku ke kartu
+    def bind_book_card(self, book_frame, book):
+        """Mengisi kartu yang sudah ada dengan data buku (tanpa membuat widget baru)"""
+        # Load book cover, pakai placeholder jika belum ada di cache memori
+        isbn = book.get('ISBN', '')
+        book_frame.isbn = isbn
+        img = self.MyLibrary.peekCover(isbn, self.cover_size)
+        pending = img is None
+        if pending:
+            img = self.cover_placeholder
+
+        book_frame.cover_btn.configure(image=img, command=lambda b=book: self.controller.showBookDetail(b))
+        book_frame.cover_btn.image = img  # Keep reference
+
+        if pending:
+            self.cover_loader.request(
+                isbn, self.cover_size,
+                lambda pil_img, f=book_frame, i=isbn: self.set_card_cover(f, i, pil_img)
+            )
+
+        # Book title (truncate if too long)
+        title = book.get('Judul', 'Judul Tidak Ada')
+        title_truncated = self.truncate_text(title, 20)
+        book_frame.title_label.configure(text=title_truncated)
+
+        # Tooltip hanya untuk judul yang dipotong
+        book_frame.title_tooltip.text = title if title_truncated != title else None
 
         # Author (optional)
         author = book.get('Penulis', '')
         if author:
             author_truncated = self.truncate_text(author, 25)
+            book_frame.author_label.configure(text=author_truncated)
+            book_frame.author_label.grid(row=2, column=0, padx=5, pady=(0, 5), sticky="ew")
 
-            author_label = self.create_label(
-                book_frame,
-                text=author_truncated,
-                text_color=self.color["primaryText"],
-                font_size=12,
-                wraplength=120,
-                anchor="center"
-            )
-            author_label.grid(row=2, column=0, padx=5, pady=(0, 5), sticky="ew")
-
-            # Add tooltip for truncated author names
-            if author_truncated != author:
-                self.create_tooltip(author_label, author)
+            # Tooltip untuk nama penulis yang dipotong
+            book_frame.author_tooltip.text = author if author_truncated != author else None
 
             # Status label
             status = book.get('Status', 'Unknown')
-            status_color = self.get_status_color(status)
-
-            status_label = self.create_label(
-                book_frame,
-                text=status,
-                font_size=12,
-                font_weight="bold",
-                text_color=status_color
-            )
-            status_label.grid(row=3, column=0, padx=10, pady=(0, 10), sticky="ew")
-
-        return book_frame
+            book_frame.status_label.configure(text=status, text_color=self.get_status_color(status))
+            book_frame.status_label.grid(row=3, column=0, padx=10, pady=(0, 10), sticky="ew")
+        else:
+            book_frame.author_tooltip.text = None
+            book_frame.author_label.grid_remove()
+            book_frame.status_label.grid_remove()
+
+    # Pasang cover hasil decode background
+    def set_card_cover(self, book_frame, isbn, pil_img):
+        """Mengganti placeholder dengan cover asli (dipanggil di main thread)"""
+        img = self.MyLibrary.coverFromImage(isbn, self.cover_size, pil_img)
+        # Kartu bisa saja sudah dipakai untuk buku lain
+        if book_frame.isbn != isbn or not book_frame.winfo_exists():
+            return
+        book_frame.cover_btn.configure(image=img)
+        book_frame.cover_btn.image = img
 
     # Truncate // Memotong teks
     def truncate_text(self, text, max_length):
@@ -609,39 +677,83 @@ class DataBookFrame(ctk.CTkFrame):
         self.next_btn.configure(state="normal" if self.current_page < self.total_pages else "disabled")
 
     # Get page slice
-    def get_page_slice(self, all_books):
+    def get_page_slice(self, all_books, page=None):
         """Mendapatkan potongan data untuk halaman saat ini"""
-        start_idx = (self.current_page - 1) * self.books_per_page
+        page = page or self.current_page
+        start_idx = (page - 1) * self.books_per_page
         end_idx = min(start_idx + self.books_per_page, len(all_books))
         return all_books.iloc[start_idx:end_idx]
 
+    # Tampilkan halaman dari hasil filter yang sudah ada
+    def show_page(self):
+        """Pindah halaman tanpa filter ulang, memakai potongan hasil prefetch jika ada"""
+        # Katalog berubah sejak hasil filter dihitung, filter ulang
+        if self.page_source is None or self.page_source_version != self.MyLibrary.version:
+            self.load_books()
+            return
+
+        page_books = self.prefetched_pages.get(self.current_page)
+        if page_books is None:
+            page_books = self.get_page_slice(self.page_source)
+        self.update_pagination_info(len(self.page_source))
+        self.render_page(page_books)
+
+    # Jadwalkan prefetch setelah halaman selesai ditampilkan
+    def schedule_prefetch(self):
+        if self.prefetch_job is not None:
+            self.after_cancel(self.prefetch_job)
+        self.prefetch_job = self.after_idle(self.prefetch_adjacent_pages)
+
+    # Prefetch halaman N±depth
+    def prefetch_adjacent_pages(self):
+        """Siapkan potongan data dan cover untuk halaman di sekitar halaman aktif"""
+        self.prefetch_job = None
+        if self.page_source is None or self.prefetch_depth < 1:
+            return
+
+        for distance in range(1, self.prefetch_depth + 1):
+            for page in (self.current_page + distance, self.current_page - distance):
+                if not 1 <= page <= self.total_pages:
+                    continue
+                page_books = self.prefetched_pages.get(page)
+                if page_books is None:
+                    page_books = self.prefetched_pages[page] = self.get_page_slice(self.page_source, page)
+
+                # Decode cover di background, hasilnya masuk cache memori
+                for isbn in page_books['ISBN'].tolist() if 'ISBN' in page_books.columns else []:
+                    if self.MyLibrary.peekCover(isbn, self.cover_size) is None:
+                        self.cover_loader.request(
+                            isbn, self.cover_size,
+                            lambda pil_img, i=isbn: self.MyLibrary.coverFromImage(i, self.cover_size, pil_img)
+                        )
+
     # halaman selanjutnya
     def next_page(self):
         """Pindah ke halaman berikutnya"""
         if self.current_page < self.total_pages:
             self.current_page += 1
-            self.load_books()
+            self.show_page()
 
     # halaman pertama
     def first_page(self):
         """Pindah ke halaman pertama"""
         if self.current_page != 1:
             self.current_page = 1
-            self.load_books()
+            self.show_page()
 
     # halaman sebelumnya
     def previous_page(self):
         """Pindah ke halaman sebelumnya"""
         if self.current_page > 1:
             self.current_page -= 1
-            self.load_books()
+            self.show_page()
 
     # halaman terakhir
     def last_page(self):
         """Pindah ke halaman terakhir"""
         if self.current_page != self.total_pages:
             self.current_page = self.total_pages
-            self.load_books()
+            self.show_page()
 
     # pergi ke halaman x
     def go_to_page(self):
@@ -653,7 +765,7 @@ class DataBookFrame(ctk.CTkFrame):
             # Check input
             if 1 <= page_num <= self.total_pages:
                 self.current_page = page_num
-                self.load_books()
+                self.show_page()
                 # Membersihkan entry
                 self.page_entry.delete(0, tk.END)
             else:
@@ -695,13 +807,17 @@ class DataBookFrame(ctk.CTkFrame):
     def populate_book_grid(self):
         """Mengisi grid dengan buku-buku untuk halaman saat ini"""
         # Metode ini digunakan untuk populasi awal dan refresh total
-        for widget in self.book_grid.winfo_children():
-            widget.destroy()
-
-        # Get all books from manager
         all_books = self.controller.getBook()
 
+        # Data bisa sudah berubah, hasil prefetch lama tidak dipakai
+        # Tanpa filter aktif, semua buku adalah sumber halaman
+        has_filter = bool(self.search_query) or self.selected_genre is not None or self.selected_status is not None
+        self.page_source = None if has_filter else all_books
+        self.page_source_version = self.MyLibrary.version
+        self.prefetched_pages = {}
+
         if all_books is None or len(all_books) == 0:
+            self.page_source = None
             self.show_no_books_message()
             return
 
@@ -709,33 +825,19 @@ class DataBookFrame(ctk.CTkFrame):
         self.update_pagination_info(len(all_books))
 
         # Mengambil buku untuk halaman saat ini
-        page_books = self.get_page_slice(all_books)
-
-        # Konfig grid
-        cols = 5  # Number of books per row
-        for i in range(cols):
-            self.book_grid.columnconfigure(i, weight=1)
-
-        # Menampilkan books di grid
-        for i, (_, book) in enumerate(page_books.iterrows()):
-            row = i // cols
-            col = i % cols
-
-            # Create book_card
-            book_card = self.create_book_card(book)
-            book_card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
+        self.render_page(self.get_page_slice(all_books))
 
     # Memperbaharui daftar buku
     def load_books(self):
         """Memuat ulang daftar buku berdasarkan pencarian, genre, dan status dengan perbaikan bug."""
-        # Hapus semua buku yang saat ini ada di halaman
-        for widget in self.book_grid.winfo_children():
-            widget.destroy()
-
         # Ambil semua buku yang sudah difilter
         filtered_books = self.get_filtered_books()
+        self.page_source = filtered_books
+        self.page_source_version = self.MyLibrary.version
+        self.prefetched_pages = {}
 
         if filtered_books is None or len(filtered_books) == 0:
+            self.page_source = None
             self.show_no_books_message()
             return
 
@@ -745,34 +847,57 @@ class DataBookFrame(ctk.CTkFrame):
         # Ambil buku untuk halaman saat ini
         start_idx = (self.current_page - 1) * self.books_per_page
         end_idx = min(start_idx + self.books_per_page, len(filtered_books))
-        page_books = filtered_books.iloc[start_idx:end_idx]
+        self.render_page(filtered_books.iloc[start_idx:end_idx])
+
+    # Tampilkan satu halaman buku memakai kartu yang sudah ada
+    def render_page(self, page_books):
+        """Mengisi ulang pool kartu; kartu hanya dibuat sekali lalu dipakai ulang"""
+        # Cover halaman sebelumnya tidak perlu di-load lagi
+        self.cover_loader.new_generation()
+        if self.no_books_label is not None:
+            self.no_books_label.grid_remove()
+            self.book_grid.rowconfigure(0, weight=0)
 
-        # Konfigurasi grid tampilan buku
-        cols = 5  # 5 buku per baris
+        # Konfig grid
+        cols = 5  # Number of books per row
         for i in range(cols):
             self.book_grid.columnconfigure(i, weight=1)
 
-        # Tampilkan buku di grid
-        for i, (_, book) in enumerate(page_books.iterrows()):
-            row = i // cols
-            col = i % cols
+        while len(self.card_pool) < len(page_books):
+            self.card_pool.append(self.create_book_card())
+
+        # Menampilkan books di grid
+        for i, book in enumerate(page_books.to_dict('records')):
+            book_card = self.card_pool[i]
+            self.bind_book_card(book_card, book)
+            book_card.grid(row=i // cols, column=i % cols, padx=10, pady=10, sticky="nsew")
+
+        # Sembunyikan kartu yang tidak terpakai di halaman ini
+        for book_card in self.card_pool[len(page_books):]:
+            book_card.isbn = None
+            book_card.grid_remove()
 
-            book_card = self.create_book_card(book)
-            book_card.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
+        self.schedule_prefetch()
 
     # Menampilkan teks error
     def show_no_books_message(self):
         """Menampilkan pesan jika tidak ada buku"""
+        self.cover_loader.new_generation()
+        for book_card in self.card_pool:
+            book_card.isbn = None
+            book_card.grid_remove()
+
         self.book_grid.columnconfigure(0, weight=1)
         self.book_grid.rowconfigure(0, weight=1)
 
-        no_books_label = self.create_label(
-            self.book_grid,
-            text="Tidak ada buku yang tersedia",
-            fg_color="transparent",
-            font_size=14
-        )
-        no_books_label.grid(row=0, column=0, pady=50)
+        if self.no_books_label is None:
+            self.no_books_label = self.create_label(
+                self.book_grid,
+                text="Tidak ada buku yang tersedia",
+                fg_color="transparent",
+                font_size=14
+            )
+        self.no_books_label.grid(row=0, column=0, columnspan=5, pady=50)
 
     
     # =============================== ADD-ONS // MISC ===============================
@@ -791,37 +916,45 @@ class DataBookFrame(ctk.CTkFrame):
         if books is None or books.empty:
             return None
 
-        # Apply search filter
+        # Hasil filter yang sama dipakai ulang selama katalog belum berubah
+        query = self.search_query.strip() if isinstance(self.search_query, str) else ""
+        # Hasil filter substring (sebelum index pencarian siap) tidak dipakai ulang setelahnya
+        cache_key = (query, self.selected_genre, self.selected_status, self.MyLibrary.version,
+                     self.MyLibrary.searchIndex.built)
+        positions = self.filter_cache.get(cache_key)
+        if positions is not None:
+            self.filter_cache.move_to_end(cache_key)
+            return books.iloc[positions]
+
+        books = self.filter_books(books)
+        self.filter_cache[cache_key] = books.index.to_numpy()
+        while len(self.filter_cache) > self.filter_cache_size:
+            self.filter_cache.popitem(last=False)
+        return books
+
+    # Pipeline filter (pencarian, genre, status)
+    def filter_books(self, books):
+        """Menjalankan pencarian dan filter facet tanpa cache"""
+        # Apply search filter - hasil dari index pencarian sudah terurut sesuai relevansi
         if isinstance(self.search_query, str) and self.search_query.strip():
-            search_columns = ['Judul', 'Penulis', 'Penerbit', 'ISBN', 'Kategori']
-            available_columns = [col for col in search_columns if col in books.columns]
-
-            if available_columns:
-                mask = books[available_columns].apply(
-                    lambda col: col.astype(str).str.contains(self.search_query, case=False, na=False)
-                ).any(axis=1)
-
-                books = books[mask]
-
-        # Apply genre filter - Ubah untuk menggunakan kategori dari CATEGORY_MAPPING
-        if self.selected_genre is not None and 'Kategori' in books.columns:
-            if self.selected_genre in CATEGORY_MAPPING:
-                # Filter berdasarkan genre yang termasuk dalam kategori yang dipilih
-                category_genres = CATEGORY_MAPPING[self.selected_genre]
-                mask = books['Kategori'].astype(str).apply(lambda x: x in category_genres)
-                books = books[mask]
-            elif self.selected_genre == 'Other':
-                # Filter semua genre yang tidak termasuk dalam kategori manapun
-                all_mapped_genres = [genre for genres in CATEGORY_MAPPING.values() for genre in genres]
-                mask = ~books['Kategori'].astype(str).isin(all_mapped_genres)
-                books = books[mask]
+            books = self.MyLibrary.searchBook(self.search_query)
+
+        # Genre (kolom Category dari CATEGORY_MAPPING) dan status difilter lewat bitmap BookManager
+        facets = {}
+        if self.selected_genre is not None:
+            if self.selected_genre in CATEGORY_MAPPING or self.selected_genre == 'Other':
+                facets['Category'] = self.selected_genre
             else:
                 # Filter untuk kategori spesifik (jika tidak termasuk dalam CATEGORY_MAPPING)
-                books = books[books['Kategori'].astype(str) == self.selected_genre]
+                facets['Kategori'] = self.selected_genre
+
+        if self.selected_status is not None:
+            facets['Status'] = self.selected_status
 
-        # Apply status filter
-        if self.selected_status is not None and 'Status' in books.columns:
-            books = books[books['Status'] == self.selected_status]
+        if facets:
+            # Index DataFrame = posisi baris di katalog, juga untuk hasil pencarian
+            mask = self.MyLibrary.facetMask(**facets)
+            books = books[mask[books.index.to_numpy()]]
 
         return books
 
@@ -858,17 +991,9 @@ class DataBookFrame(ctk.CTkFrame):
         # Tambahkan 'Other' jika ada dalam data tetapi tidak dalam mapping
         if hasattr(self.controller, 'bookManager') and hasattr(self.controller.bookManager, 'getBook'):
             books = self.controller.getBook()
-            if books is not None and 'Kategori' in books.columns:
-                # Cek apakah ada kategori 'Other' dalam data
-                for genre in books['Kategori'].astype(str).unique():
-                    categorized = False
-                    for category, keywords in CATEGORY_MAPPING.items():
-                        if genre in keywords:
-                            categorized = True
-                            break
-                    if not categorized and 'Other' not in categories:
-                        categories.append('Other')
-                        break
+            if books is not None and 'Category' in books.columns:
+                if (books['Category'] == 'Other').any():
+                    categories.append('Other')
         return sorted(categories)
 
     # Fungsi yang mengubah nilai genre pada filter genre
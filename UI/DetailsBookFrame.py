@@ -234,15 +234,10 @@ class DetailsBookFrame(ctk.CTkFrame):
         # Load book cover image
         size = (180, 270)
         isbn = str(self.selectedBook.get('ISBN', ''))
-        img_path = os.path.join(self.dataDir, f"{isbn}.jpeg")
-
-        if not os.path.exists(img_path) or not isbn:
-            img_path = self.defaultCover
             
         try:
-            img = Image.open(img_path)
-            img = img.resize(size, Image.LANCZOS)
-            photo_img = ctk.CTkImage(light_image=img, size=size)
+            # Cover diambil dari cache bersama BookManager
+            photo_img = self.controller.loadCover(isbn, size)
             self.cover_label.configure(image=photo_img)
             self.cover_label.image = photo_img
         except Exception as e:
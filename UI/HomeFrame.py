@@ -68,24 +68,24 @@ class HomeFrame(ctk.CTkFrame):
         info_frame.pack(side="right", padx=20)
         
         # Current date/time
-        date_label = ctk.CTkLabel(
+        self.date_label = ctk.CTkLabel(
             info_frame,
             text=self.home_manager.get_current_date(),
             font=ctk.CTkFont(family="Arial", size=14),
             text_color="#AAAAAA"
         )
-        date_label.pack(side="top", anchor="e")
+        self.date_label.pack(side="top", anchor="e")
         
         # Current user
         user_info = self.home_manager.get_user_info(self.current_user)
         user_text = f"Welcome, {user_info['name']}"
-        user_label = ctk.CTkLabel(
+        self.user_label = ctk.CTkLabel(
             info_frame,
             text=user_text,
             font=ctk.CTkFont(family="Arial", size=16, weight="bold"),
             text_color="#FFFFFF"
         )
-        user_label.pack(side="top", anchor="e")
+        self.user_label.pack(side="top", anchor="e")
         
         # Profile and logout buttons
         button_frame = ctk.CTkFrame(top_panel, fg_color="transparent")
@@ -177,6 +177,7 @@ class HomeFrame(ctk.CTkFrame):
         print(self.current_user)
         print(user_info["role"])
         button_config = self.home_manager.get_navigation_config(user_info["role"])
+        self.nav_role = user_info["role"]
         
         # Create the buttons
         for i, config in enumerate(button_config):
@@ -280,6 +281,19 @@ class HomeFrame(ctk.CTkFrame):
         )
         version_label.pack(side="right", padx=20, pady=10)
     
+    def refresh(self, user=None):
+        """Perbarui tanggal, nama user, dan tombol navigasi tanpa membangun ulang frame"""
+        self.current_user = user
+        user_info = self.home_manager.get_user_info(user)
+        self.date_label.configure(text=self.home_manager.get_current_date())
+        self.user_label.configure(text=f"Welcome, {user_info['name']}")
+        
+        # Tombol navigasi hanya dibuat ulang jika role berubah
+        if user_info["role"] != self.nav_role:
+            for widget in self.nav_frame.winfo_children():
+                widget.destroy()
+            self.create_navigation_buttons()
+    
     def logout(self):
         """Handle logout"""
         if hasattr(self.controller, 'current_user'):
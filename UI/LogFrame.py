@@ -0,0 +1,237 @@
+import customtkinter as ctk
+import os
+import sys
+from datetime import datetime
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Moduls.Log_Reader import LogReader
+
+ROLE_OPTIONS = ["All Roles", "admin", "user"]
+
+
+class LogFrame(ctk.CTkFrame):
+    """Halaman admin "Access Logs": filter, ringkasan login, dan aktivitas terbaru"""
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.controller = controller
+        self.configure(fg_color="#1E1E1E", corner_radius=0)
+
+        # Reader memakai folder log milik AccessLog aplikasi, logs.json lama ikut dibaca
+        self.data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+        access_log = getattr(controller, 'accessLog', None)
+        log_dir = access_log.directory if access_log else os.path.join(self.data_dir, "logs")
+        self.reader = LogReader(log_dir, legacy_file=os.path.join(self.data_dir, "logs.json"))
+
+        # Daftar dibatasi supaya jumlah widget tetap kecil walau rentang log panjang
+        self.recent_limit = 100
+        self.days_limit = 60
+        self.users_limit = 50
+        self.create_layout()
+
+    def create_layout(self):
+        self.columnconfigure(0, weight=1)
+        self.columnconfigure(1, weight=1)
+        self.rowconfigure(0, weight=0)  # Header
+        self.rowconfigure(1, weight=0)  # Filter
+        self.rowconfigure(2, weight=0)  # Statistik
+        self.rowconfigure(3, weight=1)  # Per hari / per user
+        self.rowconfigure(4, weight=1)  # Aktivitas terbaru
+
+        self.create_header()
+        self.create_filter_bar()
+        self.create_stats()
+        self.create_lists()
+
+    def create_header(self):
+        header_frame = ctk.CTkFrame(self, fg_color="#232323", height=60)
+        header_frame.grid(row=0, column=0, columnspan=2, sticky="ew")
+        header_frame.grid_propagate(False)
+
+        ctk.CTkButton(
+            header_frame,
+            text="← Back",
+            command=lambda: self.controller.showFrame("HomeFrame"),
+            fg_color="#6200EA",
+            hover_color="#5000D0",
+            text_color="white",
+            font=ctk.CTkFont(family="Arial", size=14),
+            corner_radius=10,
+            width=100,
+            height=36
+        ).pack(side="left", padx=20, pady=12)
+
+        ctk.CTkLabel(
+            header_frame,
+            text="ACCESS LOGS",
+            font=ctk.CTkFont(family="Arial", size=24, weight="bold"),
+            text_color="white"
+        ).pack(side="left", padx=20, pady=12)
+
+    def create_filter_bar(self):
+        filter_frame = ctk.CTkFrame(self, fg_color="#2A2A2A", corner_radius=10)
+        filter_frame.grid(row=1, column=0, columnspan=2, sticky="ew", padx=20, pady=(15, 5))
+
+        entry_style = dict(fg_color="#333333", border_color="#444444", text_color="white", height=32)
+
+        self.email_entry = ctk.CTkEntry(filter_frame, placeholder_text="Email", width=220, **entry_style)
+        self.email_entry.pack(side="left", padx=(15, 5), pady=10)
+
+        self.role_var = ctk.StringVar(value=ROLE_OPTIONS[0])
+        ctk.CTkOptionMenu(
+            filter_frame,
+            values=ROLE_OPTIONS,
+            variable=self.role_var,
+            fg_color="#333333",
+            button_color="#6200EA",
+            button_hover_color="#5000D0",
+            width=120,
+            height=32
+        ).pack(side="left", padx=5, pady=10)
+
+        self.start_entry = ctk.CTkEntry(filter_frame, placeholder_text="From (YYYY-MM-DD)", width=150, **entry_style)
+        self.start_entry.pack(side="left", padx=5, pady=10)
+
+        self.end_entry = ctk.CTkEntry(filter_frame, placeholder_text="To (YYYY-MM-DD)", width=150, **entry_style)
+        self.end_entry.pack(side="left", padx=5, pady=10)
+
+        ctk.CTkButton(
+            filter_frame,
+            text="Search",
+            command=self.refresh,
+            fg_color="#6200EA",
+            hover_color="#5000D0",
+            width=90,
+            height=32
+        ).pack(side="left", padx=5, pady=10)
+
+        ctk.CTkButton(
+            filter_frame,
+            text="Reset",
+            command=self.reset_filters,
+            fg_color="#444444",
+            hover_color="#555555",
+            width=70,
+            height=32
+        ).pack(side="left", padx=(5, 15), pady=10)
+
+        self.error_label = ctk.CTkLabel(filter_frame, text="", text_color="#FF5252",
+                                        font=ctk.CTkFont(family="Arial", size=12))
+        self.error_label.pack(side="left", padx=5)
+
+    def create_stats(self):
+        stats_frame = ctk.CTkFrame(self, fg_color="transparent")
+        stats_frame.grid(row=2, column=0, columnspan=2, sticky="ew", padx=20, pady=5)
+
+        self.stat_labels = {}
+        for column, (key, title) in enumerate([("total", "Total Logins"), ("users", "Unique Users"),
+                                               ("days", "Active Days"), ("last", "Last Login")]):
+            stats_frame.columnconfigure(column, weight=1)
+            card = ctk.CTkFrame(stats_frame, fg_color="#2A2A2A", corner_radius=10)
+            card.grid(row=0, column=column, sticky="ew", padx=5)
+            ctk.CTkLabel(card, text=title, text_color="#AAAAAA",
+                         font=ctk.CTkFont(family="Arial", size=12)).pack(pady=(10, 0))
+            self.stat_labels[key] = ctk.CTkLabel(card, text="-", text_color="white",
+                                                 font=ctk.CTkFont(family="Arial", size=20, weight="bold"))
+            self.stat_labels[key].pack(pady=(0, 10))
+
+    def create_lists(self):
+        self.days_list = self.create_list_panel("Logins per Day", row=3, column=0)
+        self.users_list = self.create_list_panel("Logins per User", row=3, column=1)
+        self.recent_list = self.create_list_panel("Recent Activity", row=4, column=0, columnspan=2)
+
+    def create_list_panel(self, title, row, column, columnspan=1):
+        panel = ctk.CTkFrame(self, fg_color="#2A2A2A", corner_radius=10)
+        panel.grid(row=row, column=column, columnspan=columnspan, sticky="nsew", padx=25, pady=8)
+
+        ctk.CTkLabel(panel, text=title, text_color="white",
+                     font=ctk.CTkFont(family="Arial", size=16, weight="bold")).pack(anchor="w", padx=15, pady=(10, 5))
+
+        body = ctk.CTkScrollableFrame(panel, fg_color="transparent")
+        body.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        return body
+
+    def reset_filters(self):
+        for entry in (self.email_entry, self.start_entry, self.end_entry):
+            entry.delete(0, "end")
+        self.role_var.set(ROLE_OPTIONS[0])
+        self.refresh()
+
+    def get_filters(self):
+        """Baca filter dari input, None untuk yang kosong"""
+        email = self.email_entry.get().strip() or None
+        role = self.role_var.get()
+        role = None if role == ROLE_OPTIONS[0] else role
+        dates = []
+        for entry in (self.start_entry, self.end_entry):
+            value = entry.get().strip()
+            if value:
+                datetime.strptime(value, "%Y-%m-%d")  # ValueError jika format salah
+            dates.append(value or None)
+        return email, role, dates[0], dates[1]
+
+    def refresh(self):
+        """Muat ulang ringkasan dan aktivitas sesuai filter (dipanggil saat frame ditampilkan)"""
+        try:
+            email, role, start, end = self.get_filters()
+        except ValueError:
+            self.error_label.configure(text="Use date format YYYY-MM-DD")
+            return
+        self.error_label.configure(text="")
+
+        per_day = self.reader.logins_per_day(start, end, email=email, role=role)
+        if email:
+            per_user = {email: sum(per_day.values())} if per_day else {}
+        else:
+            per_user = self.reader.logins_per_user(start, end, role=role)
+        recent = list(self.reader.query(start, end, email=email, role=role, limit=self.recent_limit))
+
+        self.stat_labels["total"].configure(text=str(sum(per_day.values())))
+        self.stat_labels["users"].configure(text=str(len(per_user)))
+        self.stat_labels["days"].configure(text=str(len(per_day)))
+        self.stat_labels["last"].configure(text=recent[0].get("timestamp", "-") if recent else "-")
+
+        # Hari terbaru dan user dengan login terbanyak; total di stat card tetap penuh
+        self.show_counts(self.days_list, list(reversed(per_day.items())), self.days_limit)
+        self.show_counts(self.users_list, list(per_user.items()), self.users_limit)
+        self.show_recent(recent)
+
+    def show_counts(self, container, items, limit):
+        for widget in container.winfo_children():
+            widget.destroy()
+
+        if not items:
+            ctk.CTkLabel(container, text="No data", text_color="#AAAAAA").pack(pady=10)
+            return
+
+        hidden = len(items) - limit
+        items = items[:limit]
+        highest = max(count for _, count in items)
+        for label, count in items:
+            row = ctk.CTkFrame(container, fg_color="transparent")
+            row.pack(fill="x", pady=2)
+            ctk.CTkLabel(row, text=label, text_color="white", width=180, anchor="w",
+                         font=ctk.CTkFont(family="Arial", size=12)).pack(side="left")
+            bar = ctk.CTkProgressBar(row, progress_color="#6200EA", fg_color="#333333", height=10)
+            bar.set(count / highest)
+            bar.pack(side="left", fill="x", expand=True, padx=10)
+            ctk.CTkLabel(row, text=str(count), text_color="#AAAAAA", width=40,
+                         font=ctk.CTkFont(family="Arial", size=12)).pack(side="right")
+        if hidden > 0:
+            ctk.CTkLabel(container, text=f"... {hidden} more", text_color="#AAAAAA",
+                         font=ctk.CTkFont(family="Arial", size=12)).pack(pady=4)
+
+    def show_recent(self, entries):
+        for widget in self.recent_list.winfo_children():
+            widget.destroy()
+
+        if not entries:
+            ctk.CTkLabel(self.recent_list, text="No activity found", text_color="#AAAAAA").pack(pady=10)
+            return
+
+        for entry in entries:
+            row = ctk.CTkFrame(self.recent_list, fg_color="#333333", corner_radius=6)
+            row.pack(fill="x", pady=2)
+            for text, width in ((entry.get("timestamp", ""), 170), (entry.get("email", ""), 260),
+                                (entry.get("role", ""), 80), (entry.get("action", ""), 80)):
+                ctk.CTkLabel(row, text=str(text), text_color="white", width=width, anchor="w",
+                             font=ctk.CTkFont(family="Arial", size=12)).pack(side="left", padx=8, pady=4)
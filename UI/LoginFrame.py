@@ -14,7 +14,7 @@ class LoginFrame(ctk.CTkFrame):
     def __init__(self, parent, controller):
         super().__init__(parent)
         self.controller = controller
-        self.auth_manager = AuthManager()
+        self.auth_manager = AuthManager(getattr(controller, "repository", None), getattr(controller, "accessLog", None))
         self.is_dark_mode = True
         self.color = COLOR_DARK if self.is_dark_mode else COLOR_LIGHT
         self.configure(fg_color=self.color["surface"], corner_radius=0)
@@ -192,7 +192,8 @@ class LoginFrame(ctk.CTkFrame):
         self.password_entry.bind("<Return>", lambda event: self.login())
         
         # Login button
-        self._create_button(container, "LOGIN", self.login).pack(fill="x", pady=(20, 10))
+        self.login_button = self._create_button(container, "LOGIN", self.login)
+        self.login_button.pack(fill="x", pady=(20, 10))
         
         # Register link
         self._create_register_link(container)
@@ -261,11 +262,12 @@ class LoginFrame(ctk.CTkFrame):
             is_primary=False
         ).pack(side="left", fill="x", expand=True, padx=(0, 5))
         
-        self._create_button(
+        self.register_button = self._create_button(
             button_container,
             "REGISTER",
             self.register
-        ).pack(side="right", fill="x", expand=True, padx=(5, 0))
+        )
+        self.register_button.pack(side="right", fill="x", expand=True, padx=(5, 0))
         
         self.current_panel = "register"
     
@@ -281,8 +283,17 @@ class LoginFrame(ctk.CTkFrame):
             messagebox.showerror("Registration Error", "Passwords do not match")
             return
         
-        # Delegasikan ke AuthManager untuk validasi lainnya dan proses registrasi
-        success, message = self.auth_manager.register(name, email, password)
+        # Delegasikan ke AuthManager (hash password di worker thread, UI tetap responsif)
+        if str(self.register_button.cget("state")) == "disabled":
+            return
+        self.register_button.configure(state="disabled", text="PLEASE WAIT...")
+        self.auth_manager.run_async(self, self._on_register_result, self.auth_manager.register, name, email, password)
+    
+    def _on_register_result(self, result):
+        """Hasil registrasi dari worker, dijalankan di thread Tk"""
+        success, message = result[:2]
+        if self.current_panel == "register":
+            self.register_button.configure(state="normal", text="REGISTER")
         
         if success:
             messagebox.showinfo("Registration Successful", message)
@@ -295,7 +306,17 @@ class LoginFrame(ctk.CTkFrame):
         email = self.email_entry.get().strip()
         password = self.password_entry.get()
         
-        success, message, user_info = self.auth_manager.login(email, password)
+        # Verifikasi password (KDF) di worker thread, hasil kembali lewat after()
+        if str(self.login_button.cget("state")) == "disabled":
+            return
+        self.login_button.configure(state="disabled", text="SIGNING IN...")
+        self.auth_manager.run_async(self, self._on_login_result, self.auth_manager.login, email, password)
+    
+    def _on_login_result(self, result):
+        """Hasil login dari worker, dijalankan di thread Tk"""
+        success, message, user_info = result
+        if self.current_panel == "login":
+            self.login_button.configure(state="normal", text="LOGIN")
         
         if success:
             self.controller.current_user = {
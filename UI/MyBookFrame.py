@@ -2,10 +2,14 @@ import tkinter as tk
 import customtkinter as ctk
 from PIL import Image, ImageTk
 import os
-import json
+import sys
 from datetime import datetime, timedelta
 import subprocess
 import platform  # Tambahkan import platform
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Moduls.Repository import Repository
+from Moduls.Penalty_Manager import PenaltyManager
 
 class MyBookFrame(ctk.CTkFrame):
     def __init__(self, parent, controller):
@@ -15,8 +19,10 @@ class MyBookFrame(ctk.CTkFrame):
         
         # Data directory for loans and bookings
         self.data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
-        self.loans_file = os.path.join(self.data_dir, "loans.json")
-        self.bookings_file = os.path.join(self.data_dir, "bookings.json")
+        self.repository = getattr(controller, 'repository', None) or Repository(self.data_dir)
+        self.loans_store = self.repository.collection("loans")
+        self.bookings_store = self.repository.collection("bookings")
+        self.penalty_manager = None
         
         # PDF directory
         self.pdf_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "pdfs")
@@ -371,15 +377,7 @@ class MyBookFrame(ctk.CTkFrame):
     def get_active_loans(self, username):
         """Get all active loans for the user"""
         try:
-            if os.path.exists(self.loans_file):
-                with open(self.loans_file, 'r') as f:
-                    loans = json.load(f)
-                
-                # Filter active loans for this user
-                return [
-                    loan for loan in loans 
-                    if loan.get('username') == username and loan.get('status') == 'active'
-                ]
+            return self.loans_store.find(username=username, status='active')
         except Exception as e:
             print(f"Error loading loans: {e}")
         
@@ -388,15 +386,7 @@ class MyBookFrame(ctk.CTkFrame):
     def get_active_bookings(self, username):
         """Get all active bookings for the user"""
         try:
-            if os.path.exists(self.bookings_file):
-                with open(self.bookings_file, 'r') as f:
-                    bookings = json.load(f)
-                
-                # Filter active bookings for this user
-                return [
-                    booking for booking in bookings 
-                    if booking.get('username') == username and booking.get('status') == 'active'
-                ]
+            return self.bookings_store.find(username=username, status='active')
         except Exception as e:
             print(f"Error loading bookings: {e}")
         
@@ -405,15 +395,7 @@ class MyBookFrame(ctk.CTkFrame):
     def get_completed_loans(self, username):
         """Get all completed loans for the user"""
         try:
-            if os.path.exists(self.loans_file):
-                with open(self.loans_file, 'r') as f:
-                    loans = json.load(f)
-                
-                # Filter completed loans for this user
-                return [
-                    loan for loan in loans 
-                    if loan.get('username') == username and loan.get('status') == 'completed'
-                ]
+            return self.loans_store.find(username=username, status='completed')
         except Exception as e:
             print(f"Error loading loans: {e}")
         
@@ -464,37 +446,15 @@ class MyBookFrame(ctk.CTkFrame):
         if not result:
             return
         
-        # Update loan status in file
+        # Pengembalian lewat PenaltyManager bersama agar denda dan status loan tetap satu sumber
         try:
-            with open(self.loans_file, 'r') as f:
-                loans = json.load(f)
-            
-            # Find and update the loan
-            for loan in loans:
-                if (loan.get('username') == self.controller.current_user.get('username') and 
-                    loan.get('isbn') == book.get('isbn') and 
-                    loan.get('status') == 'active'):
-                    
-                    loan['status'] = 'completed'
-                    loan['actual_return_date'] = datetime.now().strftime("%Y-%m-%d")
-                    
-                    # Check if returned late
-                    return_date = datetime.strptime(loan.get('return_date', ''), "%Y-%m-%d").date()
-                    if datetime.now().date() > return_date:
-                        loan['returned_late'] = True
-                        # Calculate penalty days
-                        days_late = (datetime.now().date() - return_date).days
-                        loan['days_late'] = days_late
-                        loan['penalty_amount'] = days_late * 5000  # Rp 5,000 per day
-                        
-                        # Add penalty record
-                        self.add_penalty_record(loan)
-                    else:
-                        loan['returned_late'] = False
-            
-            # Save updated loans
-            with open(self.loans_file, 'w') as f:
-                json.dump(loans, f, indent=2)
+            success, message = self.get_penalty_manager().returnBook(
+                book.get('isbn'),
+                self.controller.current_user.get('username')
+            )
+            if not success:
+                messagebox.showerror("Return Failed", message)
+                return
             
             # Update book status in database
             if hasattr(self.controller, 'updateBookStatus'):
@@ -509,36 +469,13 @@ class MyBookFrame(ctk.CTkFrame):
             print(f"Error returning book: {e}")
             messagebox.showerror("Error", f"Failed to return book: {str(e)}")
     
-    def add_penalty_record(self, loan):
-        """Add a penalty record for late return"""
-        penalty_file = os.path.join(self.data_dir, "penalties.json")
-        
-        try:
-            # Load existing penalties
-            penalties = []
-            if os.path.exists(penalty_file):
-                with open(penalty_file, 'r') as f:
-                    penalties = json.load(f)
-            
-            # Add new penalty
-            penalties.append({
-                "username": loan.get('username', ''),
-                "isbn": loan.get('isbn', ''),
-                "title": loan.get('title', ''),
-                "return_date": loan.get('return_date', ''),
-                "actual_return_date": loan.get('actual_return_date', ''),
-                "days_late": loan.get('days_late', 0),
-                "amount": loan.get('penalty_amount', 0),
-                "status": "unpaid",
-                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            })
-            
-            # Save penalties
-            with open(penalty_file, 'w') as f:
-                json.dump(penalties, f, indent=2)
-                
-        except Exception as e:
-            print(f"Error adding penalty record: {e}")
+    def get_penalty_manager(self):
+        """PenaltyManager milik aplikasi, buat sendiri jika frame dijalankan tanpa App"""
+        if hasattr(self.controller, 'getPenaltyManager'):
+            return self.controller.getPenaltyManager()
+        if self.penalty_manager is None:
+            self.penalty_manager = PenaltyManager(repository=self.repository)
+        return self.penalty_manager
     
     def cancel_booking(self, book):
         """Handle canceling a booking"""
@@ -552,23 +489,19 @@ class MyBookFrame(ctk.CTkFrame):
         if not result:
             return
         
-        # Update booking status in file
+        # Update booking status
         try:
-            with open(self.bookings_file, 'r') as f:
-                bookings = json.load(f)
+            bookings = self.bookings_store.find(
+                username=self.controller.current_user.get('username'),
+                isbn=book.get('isbn'),
+                status='active'
+            )
             
-            # Find and update the booking
+            # Update and save each matching booking
             for booking in bookings:
-                if (booking.get('username') == self.controller.current_user.get('username') and 
-                    booking.get('isbn') == book.get('isbn') and 
-                    booking.get('status') == 'active'):
-                    
-                    booking['status'] = 'canceled'
-                    booking['canceled_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Save updated bookings
-            with open(self.bookings_file, 'w') as f:
-                json.dump(bookings, f, indent=2)
+                booking['status'] = 'canceled'
+                booking['canceled_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.bookings_store.update(booking, where={'status': 'active'})
             
             # Update book status in database
             if hasattr(self.controller, 'updateBookStatus'):
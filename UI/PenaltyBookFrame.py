@@ -54,13 +54,17 @@ class PenaltyBookFrame(BaseFrame):
         super().__init__(parent, controller)
         self.controller = controller
         self.configure(fg_color=self.color["surface"], corner_radius=0)
+        self.current_user = getattr(self.controller, 'current_user', None)
         
-        # Initialize PenaltyManager
+        # PenaltyManager milik aplikasi (dipakai ulang antar kunjungan), buat sendiri jika tidak ada
         try:
-            self.penaltyManager = PenaltyManager()
-            if hasattr(self.controller, 'test_mode') and self.controller.test_mode:
-                self.penaltyManager.test_mode = True
-                self.penaltyManager.set_test_date(self.controller.test_date)
+            if hasattr(self.controller, 'getPenaltyManager'):
+                self.penaltyManager = self.controller.getPenaltyManager()
+            else:
+                self.penaltyManager = PenaltyManager(repository=getattr(self.controller, 'repository', None))
+                if hasattr(self.controller, 'test_mode') and self.controller.test_mode:
+                    self.penaltyManager.test_mode = True
+                    self.penaltyManager.set_test_date(self.controller.test_date)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to initialize penalty system: {str(e)}")
             return
@@ -68,7 +72,6 @@ class PenaltyBookFrame(BaseFrame):
         self._current_tooltip = None
         self.create_layout()
         self.bind('<Destroy>', self.on_destroy)
-        self.bind('<Visibility>', self.on_frame_shown)
     
     def create_layout(self):
         """Create the main layout structure"""
@@ -80,7 +83,6 @@ class PenaltyBookFrame(BaseFrame):
         self.create_header()
         self.create_summary_panel()
         self.create_penalties_list()
-        self.load_penalties()
     
     def create_header(self):
         """Create header with back button and title"""
@@ -193,11 +195,11 @@ class PenaltyBookFrame(BaseFrame):
         for widget in self.penalties_list_frame.winfo_children():
             widget.destroy()
         
-        if not hasattr(self.controller, 'current_user') or not self.controller.current_user:
+        if not self.current_user:
             self.show_login_required()
             return
         
-        username = self.controller.current_user.get("username")
+        username = self.current_user.get("username")
         overdue_books = self.penaltyManager.getOverdueBooks(username)
         self.update_summary(overdue_books)
         self.show_penalties(overdue_books)
@@ -241,7 +243,7 @@ class PenaltyBookFrame(BaseFrame):
         """Update summary panel with penalties data"""
         unpaid_count = len(penalties)
         total_amount = self.penaltyManager.getTotalPenalty(
-            self.controller.current_user.get("username")
+            self.current_user.get("username")
         ) if unpaid_count > 0 else 0
         
         penalty_text = f"You have {unpaid_count} unpaid {'penalty' if unpaid_count == 1 else 'penalties'}"
@@ -665,7 +667,7 @@ class PenaltyBookFrame(BaseFrame):
             
             success, message = self.penaltyManager.payPenalty(
                 penalty.get('isbn'),
-                self.controller.current_user.get('username')
+                self.current_user.get('username')
             )
             
             if success:
@@ -690,7 +692,7 @@ class PenaltyBookFrame(BaseFrame):
         try:
             success, message = self.penaltyManager.returnBook(
                 penalty.get('isbn'),
-                self.controller.current_user.get('username')
+                self.current_user.get('username')
             )
             
             if success:
@@ -732,10 +734,13 @@ class PenaltyBookFrame(BaseFrame):
         except Exception as e:
             print(f"Error during cleanup: {e}")
     
-    def on_frame_shown(self, event):
-        """Update data when frame becomes visible"""
-        if event.widget == self and self.winfo_viewable():
-            self.load_penalties()
+    def refresh(self, user=None):
+        """Muat ulang data penalty untuk user (dipanggil saat frame ditampilkan)"""
+        self.current_user = user if user is not None else getattr(self.controller, 'current_user', None)
+        if self._current_tooltip:
+            self._current_tooltip.destroy()
+            self._current_tooltip = None
+        self.load_penalties()
     
     def update_theme(self):
         """Update all UI elements with current theme colors"""
@@ -777,6 +782,7 @@ if __name__ == "__main__":
     controller = MockController()
     frame = PenaltyBookFrame(root, controller)
     frame.pack(fill="both", expand=True)
+    frame.refresh()
     
     # Add theme toggle button for testing
     def toggle_theme():
@@ -435,6 +435,10 @@ class UpdateBookFrame(ctk.CTkFrame):
                     img = img.convert('RGB')
                 img.save(cover_path, "JPEG")
                 print(f"Cover updated: {cover_path}")
+
+                # Thumbnail lama untuk ISBN ini tidak berlaku lagi
+                if hasattr(self.controller, "invalidateCover"):
+                    self.controller.invalidateCover(isbn)
             except Exception as e:
                 messagebox.showerror("Error", f"Gagal menyimpan gambar cover: {e}")
                 return
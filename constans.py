@@ -116,6 +116,11 @@ CATEGORY_MAPPING = {
                              "Animals", "Birds"],
 }
 
+# Reverse lookup genre -> kategori, dibangun sekali dari CATEGORY_MAPPING
+GENRE_TO_CATEGORY = {genre: category for category, genres in CATEGORY_MAPPING.items() for genre in genres}
+# Semua kategori yang mungkin, genre di luar mapping masuk "Other"
+GENRE_CATEGORIES = list(CATEGORY_MAPPING.keys()) + ["Other"]
+
 
 #=============== Directories ================#
 import os